@@ -1,8 +1,9 @@
-from src.analytics.summary import calculate_bet_metrics
+from src.analytics.loader import IncrementalBetsLoader
+from src.analytics.rollups import Rollups
+from src.analytics import core
 import plotly.express as px
 import pandas as pd
 import streamlit as st
-from collections import Counter
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -59,21 +60,48 @@ with st.sidebar:
     sidebar_btn("daily-report", "Daily Report")
 
 
-@st.cache_data(ttl=10)  # cache for 10 seconds
-def load_data():
-    return pd.read_csv("data/betting_log.csv", parse_dates=["timestamp"])
+@st.cache_resource
+def get_loader() -> IncrementalBetsLoader:
+    # shared by every rerun and session; each refresh only parses appended rows
+    return IncrementalBetsLoader()
 
 
-df = load_data()
+loader = get_loader()
+df = loader.refresh()
 
 
-def capital_growth_chart(df: pd.DataFrame):
-    for i, _ in df.iterrows():
-        df.at[i, "round_id"] = i + 1
+def chart_data(df: pd.DataFrame) -> dict:
+    """
+    Aggregates behind every chart, read from the rollup tables kept by the
+    bot when they exist, otherwise computed from the loaded betting log.
+    """
+    rollups = Rollups()
+    if rollups.exists():
+        bet_amounts, bet_counts = rollups.bet_sizes()
+        return {
+            "capital_growth": rollups.capital_curve(),
+            "win_loss": rollups.win_loss(),
+            "bet_sizes": (bet_amounts, bet_counts),
+            "profit_per_hour": rollups.profit_per_hour(),
+            "streaks": rollups.streak_histogram(),
+        }
+
+    # df is the loader's cached frame, so don't add columns to it
+    hours = pd.to_datetime(df["timestamp"]).dt.hour.rename("hour")
+    profit = df["balance"].diff().fillna(0).rename("profit")
+    return {
+        "capital_growth": (core.round_sequence(len(df)), df["balance"].to_numpy()),
+        "win_loss": ((df["outcome"] == "W").sum(), (df["outcome"] == "L").sum()),
+        "bet_sizes": (df["bet_amount"].to_numpy(), None),
+        "profit_per_hour": profit.groupby(hours).sum(),
+        "streaks": core.streak_histogram(df['outcome']),
+    }
+
 
+def capital_growth_chart(rounds, balances):
     data = pd.DataFrame({
-        'x': df["round_id"],
-        'y': df["balance"]
+        'x': rounds,
+        'y': balances
     })
 
     data = data.set_index('x')
@@ -81,9 +109,7 @@ def capital_growth_chart(df: pd.DataFrame):
     return st.line_chart(data)
 
 
-def win_loss_pie_chart(df: pd.DataFrame):
-    win_count = (df["outcome"] == "W").sum()
-    loss_count = (df["outcome"] == "L").sum()
+def win_loss_pie_chart(win_count: int, loss_count: int):
     fig = px.pie(
         names=["Wins", "Losses"],
         values=[win_count, loss_count],
@@ -93,15 +119,14 @@ def win_loss_pie_chart(df: pd.DataFrame):
     return st.plotly_chart(fig)
 
 
-def bet_size_histogram(df: pd.DataFrame):
-    fig = px.histogram(df["bet_amount"], nbins=20)
+def bet_size_histogram(bet_amounts, counts=None):
+    # rollups hand over each distinct amount with its count
+    fig = px.histogram(x=bet_amounts, y=counts, histfunc="sum" if counts is not None else "count", nbins=20)
     return st.plotly_chart(fig)
 
 
-def profit_per_hour_heatmap(df: pd.DataFrame):
-    df["hour"] = pd.to_datetime(df["timestamp"]).dt.hour
-    df["profit"] = df["balance"].diff().fillna(0)
-    profit_per_hour = df.groupby("hour")["profit"].sum().reset_index()
+def profit_per_hour_heatmap(profit_per_hour: pd.Series):
+    profit_per_hour = profit_per_hour.rename("profit").rename_axis("hour").reset_index()
 
     colors = [
         "#ff0000",  # red
@@ -128,35 +153,16 @@ def profit_per_hour_heatmap(df: pd.DataFrame):
 
     return st.plotly_chart(fig)
 
-def lossing_streak_lenght(df: pd.DataFrame):
-    # Get only the outcome column
-    outcomes = df['outcome'].tolist()
-
-    # Detect losing streaks
-    streaks = []
-    current_streak = 0
-
-    for outcome in outcomes:
-        if outcome in ['L', 'TIE']:
-            current_streak += 1
-        elif current_streak > 0:
-            streaks.append(current_streak)
-            current_streak = 0
-
-    if current_streak > 0:
-        streaks.append(current_streak)
-
-    streak_counts = Counter(streaks)
-
+def lossing_streak_lenght(lengths, counts):
     # Convert to DataFrame for display and plotting
-    streak_df = pd.DataFrame(sorted(streak_counts.items()), columns=["Streak Length", "Count"])
+    streak_df = pd.DataFrame({"Streak Length": lengths, "Count": counts})
     streak_df = streak_df.set_index("Streak Length")
 
     return st.bar_chart(streak_df)
 
 
 
-metrics = calculate_bet_metrics("data/betting_log.csv")
+metrics = loader.metrics()
 
 st.markdown("## **KPIs**")
 items = [
@@ -181,29 +187,30 @@ for i in range(0, len(items), cols_per_row):
 
 
 st.subheader("Charts")
+charts = chart_data(df)
 
 col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### Capital Growth Chart")
-    capital_growth_chart(df)
+    capital_growth_chart(*charts["capital_growth"])
 
 with col2:
     st.markdown("### Win/Loss Ratio")
-    win_loss_pie_chart(df)
+    win_loss_pie_chart(*charts["win_loss"])
 
 col3, col4 = st.columns(2)
 
 with col3:
     st.markdown("### Bet Size Distribution")
-    bet_size_histogram(df)
+    bet_size_histogram(*charts["bet_sizes"])
 
 with col4:
     st.markdown("### Profit per Hour")
-    profit_per_hour_heatmap(df)
+    profit_per_hour_heatmap(charts["profit_per_hour"])
 
 st.markdown("### Streak Length")
-lossing_streak_lenght(df)
+lossing_streak_lenght(*charts["streaks"])
 
 try:
     st.markdown("## Daily Report")
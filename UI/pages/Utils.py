@@ -1,6 +1,11 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
 from datetime import datetime
 import streamlit as st
-import os
+from src.ledger import get_ledger
+from src.archive import export_csv
 
 st.set_page_config(page_title="Betting Bot")
 st.title("Betting Bot")
@@ -39,9 +44,10 @@ st.markdown("#### Download Data")
 col1, col2 = st.columns(2)
 
 with col1:
-    if os.path.exists("data/betting_log.csv"):
-        file_size = os.path.getsize("data/betting_log.csv") / 1024  # KB
-        mod_time = datetime.fromtimestamp(os.path.getmtime("data/betting_log.csv"))
+    ledger = get_ledger()
+    if os.path.exists(ledger.path):
+        file_size = os.path.getsize(ledger.path) / 1024  # KB
+        mod_time = datetime.fromtimestamp(os.path.getmtime(ledger.path))
         
         st.markdown(f"""
         <div class="download-section">
@@ -52,13 +58,12 @@ with col1:
             </div>
         </div>
         """, unsafe_allow_html=True)
-        with open("data/betting_log.csv", "rb") as file:
-            st.download_button(
-                label="Download Betting Log CSV",
-                data=file,
-                file_name="betting_log.csv",
-                mime="text/csv"
-            )
+        st.download_button(
+            label="Download Betting Log CSV",
+            data=export_csv(ledger),
+            file_name="betting_log.csv",
+            mime="text/csv"
+        )
     else:
         st.write("Betting Log CSV Not Found")
 
@@ -1,11 +1,9 @@
-import csv
 import logging
 import os
 import time
 from enum import Enum
 from typing import Optional
 
-import undetected_chromedriver as uc
 from selenium.webdriver.chrome.webdriver import WebDriver
 
 # Assuming src imports are in the correct path
@@ -15,39 +13,55 @@ from src.demo import (get_last_demo_balance, init_status_panel,
 from src.actions import (place_bet, press_dragon_box, press_tiger_box,
                        wait_for_results)
 from src.config import get_config
-from src.info import get_current_balance, get_last_result, get_round_id
-from src.tg import notify, send_sync
-from src.utils import (BetLog, delay, generate_graphs,
+from src.info import PageSnapshot, get_current_balance, get_last_result, get_round_id, next_page_events, snapshot, watch_page
+from src.feed import WebSocketFeed
+from src.session import BrowserSession
+from src.alerts import AlertEngine
+from src.commands import count_commands, cycle_commands
+from src.metrics import get_metrics, start_exporter
+from src.profiler import start_profiler_control
+from src.logs import setup_logging
+from src.resources import MemoryWatchdog, enable_low_cpu_mode
+from src.rounds import Phase, RoundTracker
+from src.tg import notify
+from src.tracing import annotate, cycle, trace_driver, traced_sleep
+from src.utils import (BetLog, delay, generate_graphs_in_background,
                        is_daily_report_generated, is_eod, is_now_in_range,
-                       log_bet, save_daily_report, save_summary, reconnect, move_mouse)
+                       log_bet, backfill_daily_reports, save_summary, reconnect, move_mouse)
 from src.login import login
+from src.analytics.summary import BetMetricsTracker
+from src.analytics.rollups import Rollups, load_rollups
+from src.ledger import get_ledger
+from src import archive
 
 config = get_config()
-
-# Suppress Selenium and undetected_chromedriver logs
-logging.getLogger('selenium').setLevel(logging.WARNING)
-logging.getLogger('undetected_chromedriver').setLevel(logging.WARNING)
+metrics = get_metrics()
 
 # ANSI escape codes for coloring
 RESET = "\033[0m"
 BOLD_GREEN = "\033[1;32m"
 
-# Configure logging based on demo mode
-if config.demo.enabled:
-    log_format = f'{BOLD_GREEN}[DEMO]{RESET} %(asctime)s-[%(levelname)s] %(message)s'
-    file_name = "bettingbot_demo.log"
-else:
-    log_format = '%(asctime)s-[%(levelname)s] %(message)s'
-    file_name = "bettingbot.log"
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=log_format,
-    handlers=[
-        logging.FileHandler(file_name),
-        logging.StreamHandler()
-    ],
-)
+def configure_logging() -> None:
+    """
+    Set up the bot's logging. Called from :func:`run_bot` rather than at import,
+    so processes that import this module (spawned graph workers, the import
+    benchmark) don't open and rotate the log file too.
+    """
+    # Suppress Selenium and undetected_chromedriver logs
+    logging.getLogger('selenium').setLevel(logging.WARNING)
+    logging.getLogger('undetected_chromedriver').setLevel(logging.WARNING)
+
+    # Configure logging based on demo mode
+    if config.demo.enabled:
+        log_format = f'{BOLD_GREEN}[DEMO]{RESET} %(asctime)s-[%(levelname)s] %(message)s'
+        file_name = "bettingbot_demo.log"
+    else:
+        log_format = '%(asctime)s-[%(levelname)s] %(message)s'
+        file_name = "bettingbot.log"
+
+    # Disk and console writes happen on a listener thread, off the betting thread
+    setup_logging(log_format, file_name)
 
 
 class BetType(Enum):
@@ -66,7 +80,8 @@ class BetResult(Enum):
 class BettingBot:
     """Main betting bot class to encapsulate bot logic."""
     
-    def __init__(self):
+    def __init__(self, summary: Optional[BetMetricsTracker] = None, rollups: Optional[Rollups] = None,
+                 session: Optional[BrowserSession] = None, alerts: Optional[AlertEngine] = None):
         self.driver: Optional[WebDriver] = None
         self.bet_amt: int = config.betting.minimum_bet
         self.bet_placed_on: Optional[BetType] = None
@@ -74,6 +89,16 @@ class BettingBot:
         self.loss_streak: int = 0
         self.demo_balance: float = 0.0
         self.on_break = False
+        self.recycle_browser = False
+        self.watchdog: Optional[MemoryWatchdog] = None
+        self.summary = summary or BetMetricsTracker.from_rows(archive.iter_rows())
+        self.rollups = rollups
+        self.feed: Optional[WebSocketFeed] = None
+        self.rounds = RoundTracker()
+        # time.monotonic() of the last DOM snapshot
+        self.last_page_read = 0.0
+        self.session = session or BrowserSession()
+        self.alerts = alerts or AlertEngine()
 
         self.start_time = time.time()
         
@@ -86,17 +111,8 @@ class BettingBot:
             logging.info("Input Demo balance changed in config")
             save_input_balance()
         
-        # Create betting log CSV if it doesn't exist
-        if not os.path.exists('data/betting_log.csv'):
-            with open('data/betting_log.csv', 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['timestamp', 'round_id', 'bet_amount', 'result', 'outcome', 'balance'])
-    
-    def initialize_driver(self) -> WebDriver:
-        """Initialize and configure Chrome driver."""
-        options = uc.ChromeOptions()
-        options.add_argument("--log-level=3")
-        return uc.Chrome(options=options)
+        # Create the betting log if it doesn't exist
+        get_ledger().setup()
     
     def login(self) -> None:
         """Login to the site."""
@@ -125,22 +141,62 @@ class BettingBot:
         self.driver.save_screenshot(screenshot_path)
         logging.info(f"Screenshot saved to: {screenshot_path}")
     
-    def get_current_balance(self) -> Optional[float]:
+    def get_current_balance(self, snap: Optional[PageSnapshot] = None) -> Optional[float]:
         """Get current balance (demo or real)."""
         if not self.driver:
             return None
             
         return (self.demo_balance 
                 if config.demo.enabled 
-                else get_current_balance(self.driver))
+                else get_current_balance(self.driver, snap))
+
+    def read_state(self) -> PageSnapshot:
+        """
+        Game state from the WebSocket feed while it is flowing and shows an
+        open window, otherwise from the page. The page is also read at least
+        every ``feed_stale_after`` seconds, so a Reconnect button or a
+        suspended table the frames don't show still gets handled.
+        """
+        if self.feed is not None:
+            self.feed.poll()
+            page_is_recent = time.monotonic() - self.last_page_read < config.browser.feed_stale_after
+            if self.feed.healthy() and self.feed.state.betting_open and page_is_recent:
+                return self.feed.snapshot()
+        return self.read_page()
+
+    def wait_for_change(self, timeout: float) -> None:
+        """Block until the page or the feed may have changed, at most ``timeout`` seconds."""
+        if self.feed is not None and self.feed.healthy() and self.feed.state.betting_open:
+            traced_sleep(min(timeout, 0.2))
+            return
+        try:
+            # returns as soon as the injected observer sees a change
+            if next_page_events(self.driver, min(timeout, 5)) is not None:
+                return
+        except Exception as e:
+            logging.error(f"Could not wait for page changes: {e}")
+        traced_sleep(min(timeout, 0.5))
+
+    def read_page(self) -> PageSnapshot:
+        """Snapshot the game page, clicking Reconnect first if it is shown."""
+        snap = snapshot(self.driver)
+        self.last_page_read = time.monotonic()
+        with metrics.timer("reconnect"):
+            reconnected = reconnect(self.driver, snap)
+        if reconnected:
+            snap = snapshot(self.driver)
+        return snap
     
-    def check_balance_threshold(self, balance: float) -> None:
-        """Check if balance is below threshold and send notification."""
-        if balance < config.notification.balance_threshold:
-            try:
-                send_sync(f"Balance is below threshold: {balance}")
-            except Exception as e:
-                logging.error(f'Failed to send balance notification: {e}')
+    def skip_round(self, reason: str) -> None:
+        """Count a skipped round and mark it in the cycle's trace."""
+        metrics.inc("skips", reason=reason)
+        annotate(skipped=reason)
+
+    def check_alerts(self, balance: float, new_round: bool = True) -> None:
+        """Evaluate the alert rules and send whatever they raise, resolve or summarise."""
+        for key, msg in self.alerts.evaluate(balance, self.loss_streak, new_round):
+            logging.info(msg)
+            notify(msg, key=key)
     
     def determine_bet_choice(self, last_result: str) -> BetType:
         """Determine which bet to place based on last result and strategy."""
@@ -205,13 +261,6 @@ class BettingBot:
         self.loss_streak += 1
         logging.info(f"LOST bet of {self.bet_amt} points. Streak: {self.loss_streak}")
         
-        # Send notification if loss streak threshold reached
-        if self.loss_streak >= config.notification.loss_streak_threshold:
-            try:
-                send_sync(f"Loss streak reached: {self.loss_streak}")
-            except Exception as e:
-                logging.error(f'Failed to send loss streak notification: {e}')
-        
         if config.demo.enabled and self.driver:
             self.demo_balance -= self.bet_amt
             update_demo_balance(self.driver, self.demo_balance, "decrease")
@@ -222,17 +271,24 @@ class BettingBot:
             return False
             
         # Check if in sleep period
-        if is_now_in_range(config.sleep.start_time, config.sleep.end_time):
+        with metrics.timer("sleep_check"):
+            sleeping = is_now_in_range(config.sleep.start_time, config.sleep.end_time)
+        if sleeping:
             logging.info("Entering sleep period.")
             return False
         
         # Generate daily report if needed
-        if is_eod() and not is_daily_report_generated():
-            save_daily_report()
-            generate_graphs()
+        with metrics.timer("eod_report"):
+            if is_eod() and not is_daily_report_generated():
+                backfill_daily_reports()
+                if config.storage.archive_enabled:
+                    archive.compact()
+                generate_graphs_in_background()
         
-        reconnect(self.driver)
-        balance = self.get_current_balance()
+        with metrics.timer("read_balance"):
+            snap = self.read_state()
+            balance = self.get_current_balance(snap)
+        annotate(round_id=snap.round_id, balance=balance)
         
         if config.demo.enabled:
             click_video(self.driver)
@@ -240,64 +296,124 @@ class BettingBot:
         # Check if sufficient balance
         if balance is None or balance < self.bet_amt:
             logging.warning("Insufficient balance for the next bet. Waiting...")
-            time.sleep(30)
+            self.skip_round("insufficient_balance")
+            if balance is not None:
+                self.check_alerts(balance, new_round=False)
+            traced_sleep(30)
             return True
         
-        self.check_balance_threshold(balance)
-        
+        # Bet as soon as the betting window opens
+        if self.rounds.observe(snap) != Phase.OPEN:
+            with metrics.timer("wait_for_open"):
+                snap = self.rounds.wait_for(Phase.OPEN, self.read_state, self.wait_for_change,
+                                            config.behaviour.result_timeout)
+            if snap is None:
+                logging.warning("Betting window did not open, skipping round.")
+                self.skip_round("window_not_open")
+                return True
+
         # Get last result and determine bet
-        last_result = get_last_result(self.driver)
-        time.sleep(5)
+        with metrics.timer("get_last_result"):
+            last_result = get_last_result(self.driver, snap)
         
         bet_choice = self.determine_bet_choice(last_result)
         move_mouse(self.driver)
-        self.place_bet_action(bet_choice)
-        delay()
+        with metrics.timer("press_box"):
+            self.place_bet_action(bet_choice)
+        with metrics.timer("delay"):
+            delay()
         
         # Get round ID
-        round_id = get_round_id(self.driver)
+        with metrics.timer("get_round_id"):
+            round_id = get_round_id(self.driver, snap)
         if round_id is None:
             logging.warning("Could not get round ID, skipping round.")
+            self.skip_round("no_round_id")
             return True
         
         logging.info(f"Round ID: {round_id}")
+        annotate(round_id=round_id)
+        
+        # Start watching before the bet so a fast result isn't missed, also when the feed
+        # is healthy now: if it goes stale the result falls back to the page observer
+        watch_page(self.driver)
+
+        # Pressing the box and the delay can outlast the window; a bet placed now must
+        # still land in the round it will be logged under
+        with metrics.timer("check_window"):
+            current = self.read_state()
+            phase = self.rounds.observe(current)
+        if phase != Phase.OPEN or (current.round_id is not None and current.round_id != round_id):
+            logging.warning("Betting window closed before the bet, skipping round.")
+            self.skip_round("window_closed")
+            return True
         
         # Calculate and place bet
         self.calculate_bet_amount()
         
-        if not config.demo.enabled and not place_bet(self.driver, self.bet_amt):
+        with metrics.timer("place_bet"):
+            placed = config.demo.enabled or place_bet(self.driver, self.bet_amt)
+        if not placed:
             logging.warning("Bet failed, skipping round.")
-            time.sleep(3)
+            metrics.inc("failed_bets")
+            annotate(skipped="failed_bet")
+            traced_sleep(3)
             return True
+        self.rounds.mark_bet()
         
         # Wait for results and process
-        wait_for_results(self.driver)
-        current_result = get_last_result(self.driver)
+        with metrics.timer("wait_for_results"):
+            results = (self.feed.wait_for_result(config.behaviour.result_timeout, on_event=self.rounds.apply)
+                       if self.feed is not None else None)
+            if results is None:
+                results = wait_for_results(self.driver, on_event=self.rounds.apply)
+        if results is None:
+            logging.warning("No result for the placed bet, skipping round.")
+            self.skip_round("no_result")
+            return True
+        snap = self.read_state()
+        self.rounds.observe(snap)
+        current_result = get_last_result(self.driver, snap)
         
         if current_result is None:
             logging.warning("Could not get current result, skipping round.")
+            self.skip_round("no_current_result")
             return True
         
         self.process_bet_result(current_result)
         
         # Log bet and save summary
-        reconnect(self.driver)
-        final_balance = self.get_current_balance()
+        final_balance = self.get_current_balance(snap)
         
         if final_balance is not None and self.last_bet_status:
-            log_bet(
-                BetLog(
-                    round_id=round_id,
-                    bet_amount=self.bet_amt,
-                    result=current_result,
-                    outcome=self.last_bet_status.value,
-                    balance=final_balance
+            with metrics.timer("log_bet"):
+                log_bet(
+                    BetLog(
+                        round_id=round_id,
+                        bet_amount=self.bet_amt,
+                        result=current_result,
+                        outcome=self.last_bet_status.value,
+                        balance=final_balance
+                    ),
+                    self.summary,
+                    self.rollups
                 )
-            )
+            self.check_alerts(final_balance)
+        if self.last_bet_status:
+            metrics.inc("rounds", outcome=self.last_bet_status.value)
+            annotate(outcome=self.last_bet_status.value, bet_amount=self.bet_amt, balance=final_balance,
+                     window_used=self.rounds.timing.window_used())
         
         move_mouse(self.driver)
-        delay()
-        save_summary()
+        with metrics.timer("delay"):
+            delay()
+        with metrics.timer("save_summary"):
+            save_summary(self.summary)
+
+        # Recycle a bloated browser now that the bet is logged, unless a doubled bet is pending
+        if self.watchdog is not None and self.watchdog.recycle_requested.is_set() and self.loss_streak == 0:
+            self.recycle_browser = True
+            return False
 
         # Check if we should take a break
         if time.time() - self.start_time > config.break_options.interval and config.break_options.enabled:
@@ -314,24 +430,43 @@ class BettingBot:
 
         try:
             self.setup_directories_and_files()
-            self.driver = self.initialize_driver()
-            self.login()
+            # The browser and its login survive breaks, they are only redone when broken
+            self.driver, fresh = self.session.acquire()
+            if config.tracing.enabled:
+                trace_driver(self.driver)
+            count_commands(self.driver)
+            if config.browser.state_source == "websocket":
+                self.feed = WebSocketFeed(self.driver)
+            self.session.open_game(self.login, fresh)
+            if fresh and config.browser.low_cpu:
+                enable_low_cpu_mode(self.driver)
             self.setup_demo_mode()
+            self.watchdog = MemoryWatchdog(self.driver)
+            self.watchdog.start()
 
             # Main betting loop
-            while self.run_betting_cycle():
-                pass  # Continue until run_betting_cycle returns False
+            while True:
+                # one trace record per cycle, until run_betting_cycle returns False
+                with cycle(), cycle_commands():
+                    if not self.run_betting_cycle():
+                        break
 
         except Exception as e:
             self.capture_screenshot()
             logging.error("Error in main session", exc_info=True)
             raise
         finally:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+                self.watchdog = None
             if self.driver:
-                logging.info("Closing browser instance.")
-                self.driver.quit()
+                if not config.browser.reuse or self.recycle_browser:
+                    self.session.close()
+                    self.recycle_browser = False
                 self.driver = None
+                self.feed = None
                 if self.on_break:
+                    self.session.park()
                     logging.info("Taking a break...")
                     time.sleep(config.break_options.duration)
                     self.on_break = False
@@ -339,23 +474,40 @@ class BettingBot:
 
 def run_bot() -> None:
     """Main entry point to run the betting bot with error handling and restarts."""
+    configure_logging()
     check_interval = 2 * 60  # 2 minutes
+    # Loaded once and shared across restarts, then kept current by log_bet
+    summary = BetMetricsTracker.from_rows(archive.iter_rows())
+    from src.analytics.streaming import iter_chunks
+    rollups = load_rollups(iter_chunks())
+    session = BrowserSession()
+    alerts = AlertEngine()
+    start_exporter()
+    start_profiler_control()
+    # Catch up on reports missed while the bot wasn't running at midnight
+    if not is_daily_report_generated():
+        backfill_daily_reports()
     
-    while True:
-        try:
-            if is_now_in_range(config.sleep.start_time, config.sleep.end_time):
-                logging.info(f"Currently in sleep period. Checking again in {check_interval // 60} minutes.")
-                time.sleep(check_interval)
-                continue
-            
-            # Create new bot instance and run
-            bot = BettingBot()
-            bot.run_main_session()
-            
-        except Exception as e:
-            # logging.critical(f"A critical error occurred: {e}", exc_info=True)
-            logging.error("Restarting the bot in 60 seconds...")
-            time.sleep(60)
+    try:
+        while True:
+            try:
+                if is_now_in_range(config.sleep.start_time, config.sleep.end_time):
+                    logging.info(f"Currently in sleep period. Checking again in {check_interval // 60} minutes.")
+                    session.park()
+                    time.sleep(check_interval)
+                    continue
+                
+                # Create new bot instance and run
+                bot = BettingBot(summary, rollups, session, alerts)
+                bot.run_main_session()
+                
+            except Exception as e:
+                # logging.critical(f"A critical error occurred: {e}", exc_info=True)
+                logging.error("Restarting the bot in 60 seconds...")
+                metrics.inc("restarts")
+                time.sleep(60)
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
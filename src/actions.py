@@ -1,58 +1,43 @@
 import logging
 import time
+from typing import Callable
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from src.info import result_map
-from typing import cast
+from selenium.common.exceptions import TimeoutException
+from src.config import get_config
+from src.info import next_page_events, wait_for_snapshot
+from src.tracing import traced_sleep
 from src.utils import delay
 
-def press_dragon_box(driver: uc.Chrome):
-    logging.info("Pressing dragon box")
-
-    def try_press():
-        try:
-            btn = driver.find_element(By.XPATH, "//div[contains(@class, 'dragon-box')]")
-            if 'suspended' in cast(str, btn.get_attribute('class')):
-                time.sleep(1)
-                return try_press()  # recursive retry
-            else:
-                btn.click()
-        except Exception as e:
-            logging.error('Could not press dragon box')
-            raise e
+config = get_config()
 
-    try_press()
+def _press_box(driver: uc.Chrome, side: str):
+    logging.info(f"Pressing {side} box")
+    try:
+        # the box carries the 'suspended' class while the betting window is closed
+        wait_for_snapshot(driver, lambda s: not getattr(s, f"{side}_suspended"),
+                          timeout=config.behaviour.result_timeout, poll=0.2)
+        driver.find_element(By.XPATH, f"//div[contains(@class, '{side}-box')]").click()
+    except Exception as e:
+        logging.error(f'Could not press {side} box')
+        raise e
 
 
-def press_tiger_box(driver: uc.Chrome):
-    logging.info("Pressing tiger box")
+def press_dragon_box(driver: uc.Chrome):
+    _press_box(driver, 'dragon')
 
-    def try_press():
-        try:
-            btn = driver.find_element(By.XPATH, "//div[contains(@class, 'tiger-box')]")
-            if 'suspended' in cast(str, btn.get_attribute('class')):
-                time.sleep(1)
-                return try_press()  # retry recursively
-            else:
-                btn.click()
-        except Exception as e:
-            logging.error('Could not press tiger box')
-            raise e
 
-    try_press()
+def press_tiger_box(driver: uc.Chrome):
+    _press_box(driver, 'tiger')
 
     
 def verify_bet(driver: uc.Chrome):
     logging.info("Verifying bet")
     try:
-        toast = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//div[@class="toast-body"]'))
-        )
-        return 'Bet placed Sucessfully' in toast.text
+        snap = wait_for_snapshot(driver, lambda s: s.toast is not None, timeout=20)
+        return 'Bet placed Sucessfully' in snap.toast
     except Exception as e:
         logging.error('Could not verify bet')
 
@@ -64,7 +49,7 @@ def place_bet(driver: uc.Chrome, amount: int):
                 (By.XPATH, '//input[@id="placebetAmountWeb"]'))
         )
         bet.send_keys(str(amount))
-        time.sleep(1)
+        traced_sleep(1)
         submit = driver.find_element(By.XPATH, '//div[@class="casino-place-bet-action-buttons"]//button[@class="btn btn-primary"]')
         delay()
         submit.click()
@@ -82,41 +67,58 @@ def place_bet(driver: uc.Chrome, amount: int):
 def extract_results(driver: uc.Chrome) -> list[str] | None:
     """Extract the current results from the page"""
     try:
-        wait = WebDriverWait(driver, 10)
-        results_container = wait.until(
-            EC.presence_of_element_located((By.CLASS_NAME, "casino-video-last-results"))
-        )
-        
-        # Find all result spans
-        result_spans = results_container.find_elements(By.CSS_SELECTOR, "span.resulta, span.resultb, span.resulttie")
-        
-        results = []
-        for span in result_spans:
-            # Get the text content and the class to determine type
-            text = cast(str, span.get_attribute('class')).replace('result', '')
-            result_type = result_map[text]
-            results.append(result_type)
-        
-        return results
-        
+        return wait_for_snapshot(driver, lambda s: s.results).results
     except TimeoutException:
         print("Timeout waiting for results container")
         return None
-    except NoSuchElementException:
-        print("Could not find results elements")
-        return None
     
-def wait_for_results(driver: uc.Chrome):
+def _poll_for_results(driver: uc.Chrome, deadline: float) -> list[str] | None:
+    prev_results: list[str] | None = None
+    while time.monotonic() < deadline:
+        results = extract_results(driver)
+        if prev_results and prev_results != results:
+            return results
+        traced_sleep(1)
+        prev_results = results
+    return None
+
+
+def wait_for_results(driver: uc.Chrome, timeout: float | None = None,
+                     on_event: Callable[[str, object], None] | None = None) -> list[str] | None:
+    """
+    Block until a new result is shown and return the results list, or None
+    after ``timeout`` seconds (``[BEHAVIOUR] result_timeout`` by default).
+
+    Changes are pushed by an observer injected into the page, so the result is
+    seen as soon as it is rendered; pages the observer can't attach to fall
+    back to polling every second. ``on_event(kind, value)`` is called for
+    every observed change, the result included.
+    """
     logging.info("Waiting for results")
+    timeout = timeout or config.behaviour.result_timeout
+    deadline = time.monotonic() + timeout
     try:
-        prev_results: list[str] | None = None
         while True:
-            results = extract_results(driver)
-            if prev_results and prev_results != results:
-                logging.info(f'Got results : {results}')
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 break
-            time.sleep(1)
-            prev_results = results
+            events = next_page_events(driver, remaining)
+            if events is None:
+                results = _poll_for_results(driver, deadline)
+                if results is not None:
+                    logging.info(f'Got results : {results}')
+                return results
+            for event in events:
+                if on_event is not None:
+                    on_event(event.kind, event.value)
+                if event.kind == 'result':
+                    logging.info(f'Got results : {event.results}')
+                    return event.results
+                logging.info(f'Page changed : {event.kind} {event.value}')
 
     except Exception as e:
-        logging.error('Could not wait for results')
\ No newline at end of file
+        logging.error('Could not wait for results')
+        return None
+
+    logging.warning(f'No result within {timeout} seconds')
+    return None
@@ -0,0 +1,144 @@
+"""
+Alert rules evaluated once per round.
+
+A rule fires when its value crosses ``trigger`` and stays quiet until the
+value comes back past ``clear`` (hysteresis). While it stays active, a
+summary is sent every ``cooldown`` seconds instead of one message per round.
+Rule state is saved to ``internal/alert_state.json`` so a restart doesn't
+re-send alerts that were already sent.
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from src.config import AlertRule, get_config
+from src.tracing import span
+
+config = get_config()
+
+STATE_PATH = os.path.join("internal", "alert_state.json")
+
+
+@dataclass
+class RuleState:
+    active: bool = False
+    since: float = 0.0
+    last_sent: float = 0.0
+    rounds: int = 0
+    worst: float | None = None
+
+
+def _describe(rule: AlertRule, value: float) -> str:
+    if rule.type == 'threshold':
+        return f"{rule.metric.replace('_', ' ')} is {value:g}"
+    if rule.type == 'change':
+        return f"balance changed by {value:+g} over the last {rule.window} rounds"
+    if rule.type == 'drawdown':
+        return f"drawdown from peak is {value:g}"
+    return f"loss streak is {value:g}"
+
+
+class AlertEngine:
+    def __init__(self, rules: list[AlertRule] | None = None, path: str = STATE_PATH):
+        self.rules = config.alerts if rules is None else rules
+        self.path = path
+        window = max([r.window for r in self.rules if r.type == 'change'] or [0])
+        self.balances: deque[float] = deque(maxlen=window + 1)
+        self.peak: float | None = None
+        self.states = {rule.name: RuleState() for rule in self.rules}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load alert state: {e}")
+            return
+        self.peak = saved.get('peak')
+        self.balances.extend(saved.get('balances', []))
+        for name, state in saved.get('rules', {}).items():
+            if name in self.states:
+                self.states[name] = RuleState(**state)
+
+    def _save(self) -> None:
+        state = {
+            'peak': self.peak,
+            'balances': list(self.balances),
+            'rules': {name: asdict(s) for name, s in self.states.items()},
+        }
+        try:
+            with span('write', path=self.path):
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Could not save alert state: {e}")
+
+    def _value(self, rule: AlertRule, balance: float, loss_streak: int) -> float | None:
+        if rule.type == 'threshold':
+            return loss_streak if rule.metric == 'loss_streak' else balance
+        if rule.type == 'change':
+            if len(self.balances) <= rule.window:
+                return None
+            return balance - self.balances[-rule.window - 1]
+        if rule.type == 'drawdown':
+            return (self.peak or balance) - balance
+        return loss_streak
+
+    def _crossed(self, rule: AlertRule, value: float, level: float) -> bool:
+        """Whether ``value`` is on the alerting side of ``level``."""
+        if rule.direction == 'below':
+            return value <= level
+        return value >= level
+
+    def evaluate(self, balance: float, loss_streak: int, new_round: bool = True) -> list[tuple[str, str]]:
+        """
+        Check every rule against the latest balance and loss streak and return
+        ``(key, message)`` pairs to send, keyed by rule and kind of message. ``new_round`` is False for
+        checks between rounds, which don't count towards round windows.
+        """
+        now = time.time()
+        if new_round:
+            self.balances.append(balance)
+            self.peak = balance if self.peak is None else max(self.peak, balance)
+
+        messages = []
+        for rule in self.rules:
+            value = self._value(rule, balance, loss_streak)
+            if value is None:
+                continue
+            state = self.states[rule.name]
+
+            if not state.active:
+                if self._crossed(rule, value, rule.trigger):
+                    self.states[rule.name] = RuleState(active=True, since=now, last_sent=now,
+                                                       rounds=int(new_round), worst=value)
+                    messages.append((f"{rule.name}:alert", f"Alert {rule.name}: {_describe(rule, value)}"))
+                continue
+
+            if new_round:
+                state.rounds += 1
+            worse = value < state.worst if rule.direction == 'below' else value > state.worst
+            state.worst = value if state.worst is None or worse else state.worst
+
+            if not self._crossed(rule, value, rule.clear):
+                state.active = False
+                messages.append((f"{rule.name}:resolved", f"Resolved {rule.name} after {state.rounds} rounds: "
+                                            f"{_describe(rule, value)}"))
+            elif now - state.last_sent >= rule.cooldown:
+                state.last_sent = now
+                minutes = (now - state.since) / 60
+                messages.append((f"{rule.name}:summary", f"Still active {rule.name} for {minutes:.0f} min / "
+                                            f"{state.rounds} rounds, worst {state.worst:g}: "
+                                            f"{_describe(rule, value)}"))
+
+        self._save()
+        return messages
@@ -0,0 +1,120 @@
+"""
+Vectorized kernels shared by the summary, daily report, graphs and Dashboard.
+
+Everything here works on whole columns with NumPy run-length and cumulative
+operations, so it stays fast on frames with millions of rows.
+"""
+import numpy as np
+import pandas as pd
+
+# Outcomes that extend a losing streak
+LOSING_OUTCOMES = ('l', 'tie')
+
+
+def as_categorical(outcomes: pd.Series | np.ndarray) -> pd.Series:
+    """
+    Encode an outcome column once so repeated masks only compare integer codes.
+    Already categorical columns are returned as is.
+    """
+    outcomes = pd.Series(outcomes, copy=False)
+    if isinstance(outcomes.dtype, pd.CategoricalDtype):
+        return outcomes
+    return outcomes.astype('category')
+
+
+def outcome_mask(outcomes: pd.Series | np.ndarray, *values: str) -> np.ndarray:
+    """
+    Boolean mask of the rows whose outcome is one of ``values``, ignoring case.
+
+    Only the distinct outcomes are lowercased, never the full column.
+    """
+    outcomes = as_categorical(outcomes)
+    codes, uniques = outcomes.cat.codes.to_numpy(), outcomes.cat.categories
+    wanted = {v.lower() for v in values}
+    # Lookup table indexed by code; the extra last slot maps missing values (-1)
+    lookup = np.zeros(len(uniques) + 1, dtype=bool)
+    lookup[[i for i, u in enumerate(uniques) if str(u).lower() in wanted]] = True
+    return lookup[codes]
+
+
+def losing_mask(outcomes: pd.Series | np.ndarray) -> np.ndarray:
+    return outcome_mask(outcomes, *LOSING_OUTCOMES)
+
+
+def run_lengths(mask: np.ndarray) -> np.ndarray:
+    """Lengths of every run of consecutive ``True`` values, in order."""
+    mask = np.asarray(mask, dtype=bool)
+    if mask.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    padded = np.zeros(mask.size + 2, dtype=bool)
+    padded[1:-1] = mask
+    # Positions where the mask flips alternate between run starts and run ends
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[1::2] - edges[::2]
+
+
+def carried_run_lengths(mask: np.ndarray, carry: int) -> tuple[np.ndarray, int]:
+    """
+    Run lengths of one chunk of a longer sequence.
+
+    ``carry`` is the length of the run still open at the end of the previous
+    chunk; it is added to a run starting at the first row. Returns the
+    lengths and the run still open at the end of this chunk.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    lengths = run_lengths(mask)
+    if mask.size == 0:
+        return lengths, carry
+    if carry and mask[0]:
+        lengths[0] += carry
+    return lengths, int(lengths[-1]) if mask[-1] else 0
+
+
+def streak_lengths(outcomes: pd.Series | np.ndarray) -> np.ndarray:
+    """Lengths of all losing streaks (losses and ties)."""
+    return run_lengths(losing_mask(outcomes))
+
+
+def max_losing_streak(outcomes: pd.Series | np.ndarray) -> int:
+    lengths = streak_lengths(outcomes)
+    return int(lengths.max()) if lengths.size else 0
+
+
+def streak_histogram(outcomes: pd.Series | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct losing streak lengths and how often each occurred."""
+    return np.unique(streak_lengths(outcomes), return_counts=True)
+
+
+def max_drawdown(balances: pd.Series | np.ndarray) -> float:
+    """Largest drop from a running balance peak."""
+    balances = np.asarray(balances, dtype=np.float64)
+    if balances.size == 0:
+        return 0.0
+    return float((np.maximum.accumulate(balances) - balances).max())
+
+
+def start_balance(outcomes: pd.Series, bet_amounts: pd.Series, balances: pd.Series):
+    """
+    Balance before the first bet, inferred from the first row: a win added
+    the bet amount, a loss removed it and anything else left it unchanged.
+    """
+    if len(balances) == 0:
+        return 0.0
+    outcome = str(outcomes.iloc[0]).lower()
+    bet_amount = bet_amounts.iloc[0]
+    balance = balances.iloc[0]
+    if outcome == 'w':
+        return balance - bet_amount
+    if outcome == 'l':
+        return balance + bet_amount
+    return balance
+
+
+def end_balance(balances: pd.Series):
+    """Balance after the last bet."""
+    return balances.iloc[-1] if len(balances) else 0.0
+
+
+def round_sequence(n: int) -> np.ndarray:
+    """Serial round numbers 1..n used as the x-axis of balance charts."""
+    return np.arange(1, n + 1)
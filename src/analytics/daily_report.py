@@ -1,5 +1,20 @@
 import pandas as pd
 from datetime import datetime
+from src.analytics import core
+
+
+def _default_report(report_date_str: str) -> dict:
+    return {
+        "report_date": report_date_str,
+        "total_rounds_played": 0,
+        "total_wins": 0,
+        "total_losses": 0,
+        "total_profit": 0.0,
+        "max_bet_placed": 0,
+        "max_losing_streak": 0,
+        "start_balance": 0.0,
+        "final_balance": 0.0,
+    }
 
 
 def generate_daily_report(csv_file_path: str, report_date_str: str) -> dict:
@@ -25,17 +40,7 @@ def generate_daily_report(csv_file_path: str, report_date_str: str) -> dict:
               - total_profit
               Returns an empty dict or a dict with zeros if errors occur or no data.
     """
-    default_report = {
-        "report_date": report_date_str,
-        "total_rounds_played": 0,
-        "total_wins": 0,
-        "total_losses": 0,
-        "total_profit": 0.0,
-        "max_bet_placed": 0,
-        "max_losing_streak": 0,
-        "start_balance": 0.0,
-        "final_balance": 0.0,
-    }
+    default_report = _default_report(report_date_str)
 
     try:
         df = pd.read_csv(csv_file_path)
@@ -49,78 +54,52 @@ def generate_daily_report(csv_file_path: str, report_date_str: str) -> dict:
         print(f"Error reading CSV file {csv_file_path}: {e}")
         return default_report
 
+    return daily_report_from_df(df, report_date_str)
+
+
+def daily_report_from_df(df: pd.DataFrame, report_date_str: str) -> dict:
+    """
+    Builds the daily report for ``report_date_str`` from an already loaded
+    betting log. ``df`` may hold the whole log or only the rows of that day.
+    """
+    default_report = _default_report(report_date_str)
+
     if df.empty:
         return default_report
 
     try:
-        # Convert timestamp column to datetime objects
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        # Convert report_date_str to a date object for comparison
-        report_date = pd.to_datetime(report_date_str).date()
+        timestamps = pd.to_datetime(df['timestamp'])
+        report_day = pd.Timestamp(report_date_str).normalize()
     except Exception as e:
         print(f"Error processing date/timestamp: {e}")
         return default_report
 
-    # Filter DataFrame for the given report_date
-    # Ensure comparison is between date objects (df['timestamp'].dt.date)
-    # Use .copy() to avoid SettingWithCopyWarning
-    daily_df = df[df['timestamp'].dt.date == report_date].copy()
+    # Filter DataFrame for the given report date
+    daily_df = df[(timestamps >= report_day) & (timestamps < report_day + pd.Timedelta(days=1))]
 
     if daily_df.empty:
         print(f"No data found for date: {report_date_str}")
         return default_report
 
-    # Ensure 'outcome' column is treated as string and lowercased for comparison
-    daily_df['outcome'] = daily_df['outcome'].astype(str).str.lower()
-    daily_df['bet_amount'] = pd.to_numeric(
-        daily_df['bet_amount'], errors='coerce').fillna(0)
-    daily_df['balance'] = pd.to_numeric(
-        daily_df['balance'], errors='coerce').fillna(0)
+    outcomes = core.as_categorical(daily_df['outcome'])
+    bet_amounts = pd.to_numeric(daily_df['bet_amount'], errors='coerce').fillna(0)
+    balances = pd.to_numeric(daily_df['balance'], errors='coerce').fillna(0)
 
     # Calculate daily metrics
     total_rounds_played = len(daily_df)
-    total_wins = daily_df[daily_df['outcome'] == 'w'].shape[0]
-    total_losses = daily_df[daily_df['outcome'] == 'l'].shape[0]
+    total_wins = int(core.outcome_mask(outcomes, 'w').sum())
+    total_losses = int(core.outcome_mask(outcomes, 'l').sum())
 
     # Calculate Total Profit for the day
     # Method: End_Balance_of_Day - Start_Balance_of_Day
-    # 1. Determine Start Balance for the day
-    first_daily_row = daily_df.iloc[0]
-    start_balance_for_day = 0.0
-    if first_daily_row['outcome'] == 'w':
-        # balance_after = balance_before + bet_amount_won
-        start_balance_for_day = first_daily_row['balance'] - \
-            first_daily_row['bet_amount']
-    elif first_daily_row['outcome'] == 'l':
-        # balance_after = balance_before - bet_amount_lost
-        start_balance_for_day = first_daily_row['balance'] + \
-            first_daily_row['bet_amount']
-    else:
-        # Fallback for other outcomes (e.g., push/draw if bet_amount is 0 or represents stake returned)
-        # Assumes for non win/loss, the balance_before is the same as balance_after if bet_amount is 0.
-        start_balance_for_day = first_daily_row['balance']
-
-    # 2. Determine End Balance for the day
-    end_balance_for_day = daily_df.iloc[-1]['balance']
-
-    # 3. Calculate Total Profit
+    start_balance_for_day = core.start_balance(outcomes, bet_amounts, balances)
+    end_balance_for_day = core.end_balance(balances)
     total_profit = end_balance_for_day - start_balance_for_day
 
-    # 4. Calculate max loss streak
-    max_losing_streak = 0
-    current_losing_streak = 0
-    for outcome in daily_df['outcome']:
-        if outcome in ['l', 'tie']:
-            current_losing_streak += 1
-        else:
-            if current_losing_streak > max_losing_streak:
-                max_losing_streak = current_losing_streak
-            current_losing_streak = 0
-    if current_losing_streak > max_losing_streak:  # Check for a streak ending at the last round
-        max_losing_streak = current_losing_streak
-
-    # 5. Calculate max bet placed
-    max_bet_placed: int = 0 if daily_df.empty else daily_df['bet_amount'].max()
+    max_losing_streak = core.max_losing_streak(outcomes)
+
+    # Calculate max bet placed
+    max_bet_placed: int = 0 if daily_df.empty else bet_amounts.max()
 
     return {
         "report_date": report_date_str,
@@ -135,6 +114,37 @@ def generate_daily_report(csv_file_path: str, report_date_str: str) -> dict:
     }
 
 
+def daily_reports_from_df(df: pd.DataFrame) -> list[dict]:
+    """
+    Builds the daily report of every day present in ``df`` in a single
+    grouped pass, ordered by date.
+    """
+    if df.empty:
+        return []
+
+    days = pd.to_datetime(df['timestamp']).dt.strftime('%Y-%m-%d')
+    return [daily_report_from_df(day_df, str(day))
+            for day, day_df in df.groupby(days, sort=True)]
+
+
+def daily_report_from_tracker(tracker, report_date_str: str) -> dict:
+    """Daily report from a :class:`BetMetricsTracker` fed with one day of bets."""
+    if tracker.total_rounds == 0:
+        return _default_report(report_date_str)
+
+    return {
+        "report_date": report_date_str,
+        "total_rounds_played": tracker.total_rounds,
+        "total_wins": tracker.wins,
+        "total_losses": tracker.losses,
+        "total_profit": float(tracker.final_balance - tracker.initial_balance),
+        "max_bet_placed": tracker.max_bet_placed,
+        "max_losing_streak": tracker.max_losing_streak,
+        "start_balance": tracker.initial_balance,
+        "final_balance": tracker.final_balance,
+    }
+
+
 if __name__ == '__main__':
     report = generate_daily_report("data/betting_log.csv", "2025-06-12")
     print(report)
@@ -1,15 +1,26 @@
+import os
 from matplotlib.ticker import MaxNLocator
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from src.analytics import core
+
+
+def _save(path: str):
+    """Write the current figure to a temp file first so readers never see a partial image."""
+    tmp_path = f"{path}.tmp"
+    plt.savefig(tmp_path, format="png")
+    os.replace(tmp_path, path)
+
 
 def generate_capital_growth_curve(df: pd.DataFrame, save=True):
-    # convert round_id to serial number
-    for i, _ in df.iterrows():
-        df.at[i, "round_id"] = i + 1
+    # plot against serial round numbers instead of round_id
+    return plot_capital_growth(core.round_sequence(len(df)), df["balance"], save)
+
 
+def plot_capital_growth(rounds, balances, save=True):
     fig = plt.figure(figsize=(10, 5))
-    plt.plot(df["round_id"], df["balance"],
+    plt.plot(rounds, balances,
              label="Wallet Balance", color="green")
     plt.title("Capital Growth Curve")
     plt.xlabel("Round")
@@ -21,7 +32,7 @@ def generate_capital_growth_curve(df: pd.DataFrame, save=True):
 
     plt.tight_layout()
     if save:
-        plt.savefig("data/capital_over_time.png")
+        _save("data/capital_over_time.png")
         plt.close()
     return fig
 
@@ -29,23 +40,32 @@ def generate_capital_growth_curve(df: pd.DataFrame, save=True):
 def win_loss_pie_chart(df: pd.DataFrame):
     win_count = (df["outcome"] == "W").sum()
     loss_count = (df["outcome"] == "L").sum()
+    plot_win_loss(win_count, loss_count)
+
+
+def plot_win_loss(win_count, loss_count):
     plt.figure(figsize=(6, 6))
     plt.pie([win_count, loss_count], labels=["Wins", "Losses"],
             autopct="%1.1f%%", colors=["green", "red"])
     plt.title("Win vs Loss Ratio")
     plt.tight_layout()
-    plt.savefig("data/win_loss_ratio.png")
+    _save("data/win_loss_ratio.png")
     plt.close()
 
 
 def bet_size_histogram(df: pd.DataFrame):
+    plot_bet_sizes(df["bet_amount"])
+
+
+def plot_bet_sizes(bet_amounts, counts=None):
+    """``counts`` weights each value of ``bet_amounts`` when they are pre-aggregated."""
     plt.figure(figsize=(8, 5))
-    plt.hist(df["bet_amount"], bins=20, color="skyblue", edgecolor="black")
+    plt.hist(bet_amounts, bins=20, weights=counts, color="skyblue", edgecolor="black")
     plt.title("Distribution of Bet Sizes")
     plt.xlabel("Bet Amount (₹)")
     plt.ylabel("Frequency")
     plt.tight_layout()
-    plt.savefig("data/bet_size_histogram.png")
+    _save("data/bet_size_histogram.png")
     plt.close()
 
 
@@ -53,7 +73,12 @@ def profit_per_hour_heatmap(df: pd.DataFrame):
     df["hour"] = pd.to_datetime(df["timestamp"]).dt.hour
     df["profit"] = df["balance"].diff().fillna(0)
 
-    profit_per_hour = df.groupby("hour")["profit"].sum().reset_index()
+    plot_profit_per_hour(df.groupby("hour")["profit"].sum())
+
+
+def plot_profit_per_hour(profit_per_hour: pd.Series):
+    """``profit_per_hour`` is the summed profit indexed by hour of day."""
+    profit_per_hour = profit_per_hour.rename("profit").rename_axis("hour").reset_index()
 
     # Convert to pivot (though it's a 1D heatmap, we reshape)
     pivot = profit_per_hour.pivot_table(index="hour", values="profit")
@@ -63,10 +88,24 @@ def profit_per_hour_heatmap(df: pd.DataFrame):
     plt.title("Profit per Hour")
     plt.ylabel("Hour")
     plt.tight_layout()
-    plt.savefig("data/profit_per_hour_heatmap.png")
+    _save("data/profit_per_hour_heatmap.png")
     plt.close()
 
 
+CHARTS = {
+    "capital_growth": plot_capital_growth,
+    "win_loss": plot_win_loss,
+    "bet_sizes": plot_bet_sizes,
+    "profit_per_hour": plot_profit_per_hour,
+}
+
+
+def render_chart(name: str, *args) -> str:
+    """Render one chart from ``CHARTS``; picklable entry point for worker processes."""
+    CHARTS[name](*args)
+    return name
+
+
 if __name__ == "__main__":
     df = pd.read_csv("data/betting_log.csv", parse_dates=["timestamp"])
     # generate_capital_growth_curve(df)
@@ -0,0 +1,63 @@
+import threading
+
+import pandas as pd
+
+from src.analytics.summary import BetMetricsTracker
+from src.archive import read_archive
+from src.ledger import Ledger, TailCursor, get_ledger
+
+
+def _as_ints(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors='coerce').fillna(0).astype(int)
+
+
+class IncrementalBetsLoader:
+    """
+    Keeps the betting history in memory and only parses rows appended to the
+    live log since the previous refresh.
+
+    The same frame feeds the charts and a :class:`BetMetricsTracker` for the
+    KPIs, so a refresh costs time proportional to the number of new rounds.
+    The archive is only re-read when the live log was rewritten (e.g. by
+    compaction).
+    """
+
+    def __init__(self, ledger: Ledger | None = None):
+        self.ledger = ledger or get_ledger()
+        self.df: pd.DataFrame | None = None
+        self.cursor: TailCursor | None = None
+        self.tracker = BetMetricsTracker()
+        self._lock = threading.Lock()
+
+    def _track(self, df: pd.DataFrame) -> None:
+        self.tracker.update_chunk(_as_ints(df['bet_amount']), df['outcome'], _as_ints(df['balance']))
+
+    def _reload(self) -> None:
+        live, self.cursor = self.ledger.read_since(None)
+        archived = read_archive()
+        frames = [f for f in (archived, live) if f is not None and not f.empty]
+        self.df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else live)
+        self.tracker = BetMetricsTracker()
+        self._track(self.df)
+
+    def refresh(self) -> pd.DataFrame:
+        """Return the full history, parsing only what was appended since the last call."""
+        with self._lock:
+            if self.df is None:
+                self._reload()
+                return self.df
+
+            new_rows, cursor = self.ledger.read_since(self.cursor)
+            if new_rows is None:
+                self._reload()
+            elif not new_rows.empty:
+                self.cursor = cursor
+                self.df = pd.concat([self.df, new_rows], ignore_index=True)
+                self._track(new_rows)
+            else:
+                self.cursor = cursor
+            return self.df
+
+    def metrics(self) -> dict:
+        """Same output as :func:`calculate_bet_metrics` for the loaded history."""
+        return self.tracker.metrics()
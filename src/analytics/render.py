@@ -0,0 +1,44 @@
+"""
+Renders the charts in a process pool, run by the bot as a separate process:
+
+    python -m src.analytics.render < payloads.pickle
+
+Spawned pool workers import the ``__main__`` module of the process that owns
+the pool. Owning it from here rather than from the bot means they import
+this module and the charting code only, not ``main.py`` and the browser,
+Telegram and analytics modules behind it. Payloads are the pickled
+``{chart name: args}`` of ``render_chart``; a chart that fails is logged to
+stderr and the exit code is non-zero.
+"""
+import logging
+import multiprocessing
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_all(payloads: dict[str, tuple]) -> int:
+    """Render every chart in its own worker and return the number that failed."""
+    from src.analytics.graphs import render_chart
+    failed = 0
+    with ProcessPoolExecutor(max_workers=len(payloads),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(render_chart, name, *args): name for name, args in payloads.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                failed += 1
+                logging.error(f"Failed to render {futures[future]} chart", exc_info=True)
+    return failed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format='%(levelname)s %(message)s')
+    sys.exit(1 if render_all(pickle.load(sys.stdin.buffer)) else 0)
@@ -0,0 +1,273 @@
+"""
+Hourly and daily rollup tables maintained by the bot as it logs bets.
+
+Each logged bet updates a handful of small rows in ``data/rollups.db``, so
+the Dashboard and the graphs can be drawn from the rollups at a cost that
+does not depend on how many rounds have been played.
+"""
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.analytics import core
+from src.config import get_config
+
+config = get_config()
+
+BUCKET_COLUMNS = ['rounds', 'wins', 'losses', 'ties', 'profit', 'max_bet', 'close_balance']
+
+
+def _hour(timestamp: str) -> str:
+    return f"{timestamp[:13]}:00"
+
+
+def _day(timestamp: str) -> str:
+    return timestamp[:10]
+
+
+class Rollups:
+    """
+    Per-hour and per-day counters of rounds, wins, losses, ties, profit,
+    max bet and closing balance, plus losing streak lengths (recorded in the
+    hour the streak ended) and bet size counts.
+
+    Profit of a round is the balance change since the previous round, the
+    same definition the profit-per-hour chart uses.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or config.storage.rollup_path
+        self.last_balance: int | None = None
+        self.current_streak = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def setup(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            for table in ('rollup_hourly', 'rollup_daily'):
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        period TEXT PRIMARY KEY,
+                        rounds INTEGER NOT NULL,
+                        wins INTEGER NOT NULL,
+                        losses INTEGER NOT NULL,
+                        ties INTEGER NOT NULL,
+                        profit REAL NOT NULL,
+                        max_bet INTEGER NOT NULL,
+                        close_balance INTEGER NOT NULL
+                    )
+                """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_streaks (
+                    hour TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (hour, length)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_bet_sizes (
+                    amount INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS rollup_state (key TEXT PRIMARY KEY, value INTEGER)")
+            state = dict(conn.execute("SELECT key, value FROM rollup_state"))
+        self.last_balance = state.get('last_balance')
+        self.current_streak = state.get('current_streak', 0) or 0
+
+    def is_empty(self) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM rollup_daily").fetchone()[0] == 0
+
+    def _write(self, conn: sqlite3.Connection, hourly: list[tuple], daily: list[tuple],
+               streaks: list[tuple], bet_sizes: list[tuple]) -> None:
+        for table, rows in (('rollup_hourly', hourly), ('rollup_daily', daily)):
+            conn.executemany(f"""
+                INSERT INTO {table} (period, {', '.join(BUCKET_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(period) DO UPDATE SET
+                    rounds = rounds + excluded.rounds,
+                    wins = wins + excluded.wins,
+                    losses = losses + excluded.losses,
+                    ties = ties + excluded.ties,
+                    profit = profit + excluded.profit,
+                    max_bet = MAX(max_bet, excluded.max_bet),
+                    close_balance = excluded.close_balance
+            """, rows)
+        conn.executemany("""
+            INSERT INTO rollup_streaks (hour, length, count) VALUES (?, ?, ?)
+            ON CONFLICT(hour, length) DO UPDATE SET count = count + excluded.count
+        """, streaks)
+        conn.executemany("""
+            INSERT INTO rollup_bet_sizes (amount, count) VALUES (?, ?)
+            ON CONFLICT(amount) DO UPDATE SET count = count + excluded.count
+        """, bet_sizes)
+        conn.executemany("INSERT OR REPLACE INTO rollup_state (key, value) VALUES (?, ?)",
+                         [('last_balance', self.last_balance), ('current_streak', self.current_streak)])
+
+    def add(self, timestamp: str, bet_amount: int, outcome: str, balance: int) -> None:
+        """Account for one logged bet; ``timestamp`` is in 'YYYY-MM-DD HH:MM:SS' format."""
+        bet_amount, balance = int(bet_amount), int(balance)
+        outcome = str(outcome).lower()
+        profit = 0.0 if self.last_balance is None else float(balance - self.last_balance)
+        counts = (int(outcome == 'w'), int(outcome == 'l'), int(outcome == 'tie'))
+        bucket = (1, *counts, profit, bet_amount, balance)
+
+        streaks = []
+        if outcome in core.LOSING_OUTCOMES:
+            self.current_streak += 1
+        elif self.current_streak:
+            streaks.append((_hour(timestamp), self.current_streak, 1))
+            self.current_streak = 0
+        self.last_balance = balance
+
+        with closing(self._connect()) as conn, conn:
+            self._write(conn, [(_hour(timestamp), *bucket)], [(_day(timestamp), *bucket)],
+                        streaks, [(bet_amount, 1)])
+
+    def add_chunk(self, df: pd.DataFrame) -> None:
+        """
+        Vectorized :meth:`add` for a block of consecutive bets with a
+        'YYYY-MM-DD HH:MM:SS' string or datetime timestamp column.
+        """
+        if df.empty:
+            return
+        timestamps = df['timestamp']
+        # compact chunks from the streaming reader carry epoch seconds
+        unit = 's' if pd.api.types.is_integer_dtype(timestamps) else None
+        timestamps = pd.to_datetime(timestamps, unit=unit).dt.strftime('%Y-%m-%d %H:%M:%S')
+        hours = timestamps.str.slice(0, 13) + ':00'
+        days = timestamps.str.slice(0, 10)
+        bet_amounts = pd.to_numeric(df['bet_amount'], errors='coerce').fillna(0).astype('int64')
+        balances = pd.to_numeric(df['balance'], errors='coerce').fillna(0).astype('int64')
+        outcomes = core.as_categorical(df['outcome'])
+
+        previous = balances.iloc[0] if self.last_balance is None else self.last_balance
+        frame = pd.DataFrame({
+            'hour': hours.to_numpy(),
+            'day': days.to_numpy(),
+            'wins': core.outcome_mask(outcomes, 'w').astype('int64'),
+            'losses': core.outcome_mask(outcomes, 'l').astype('int64'),
+            'ties': core.outcome_mask(outcomes, 'tie').astype('int64'),
+            'profit': np.diff(balances.to_numpy(), prepend=previous).astype(np.float64),
+            'max_bet': bet_amounts.to_numpy(),
+            'close_balance': balances.to_numpy(),
+        })
+        aggregations = {'rounds': ('wins', 'size'), 'wins': ('wins', 'sum'), 'losses': ('losses', 'sum'),
+                        'ties': ('ties', 'sum'), 'profit': ('profit', 'sum'),
+                        'max_bet': ('max_bet', 'max'), 'close_balance': ('close_balance', 'last')}
+        hourly = frame.groupby('hour', sort=True).agg(**aggregations)
+        daily = frame.groupby('day', sort=True).agg(**aggregations)
+
+        # Losing streaks closed inside this block, keyed by the hour of the row ending them
+        mask = core.losing_mask(outcomes)
+        padded = np.zeros(mask.size + 2, dtype=bool)
+        padded[1:-1] = mask
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        starts, ends = edges[::2], edges[1::2]
+        lengths = ends - starts
+        if self.current_streak and mask[0]:
+            lengths[0] += self.current_streak
+        closed = [(hours.iloc[e], int(n)) for e, n in zip(ends, lengths) if e < mask.size]
+        if self.current_streak and not mask[0]:
+            closed.insert(0, (hours.iloc[0], self.current_streak))
+        self.current_streak = int(lengths[-1]) if mask[-1] else 0
+        self.last_balance = int(balances.iloc[-1])
+
+        streak_counts: dict[tuple[str, int], int] = {}
+        for key in closed:
+            streak_counts[key] = streak_counts.get(key, 0) + 1
+        values, counts = np.unique(bet_amounts.to_numpy(), return_counts=True)
+
+        def rows(table: pd.DataFrame) -> list[tuple]:
+            return [(period, *(int(v) if c != 'profit' else float(v) for c, v in zip(BUCKET_COLUMNS, row)))
+                    for period, row in zip(table.index, table[BUCKET_COLUMNS].itertuples(index=False))]
+
+        with closing(self._connect()) as conn, conn:
+            self._write(conn, rows(hourly), rows(daily),
+                        [(hour, length, count) for (hour, length), count in streak_counts.items()],
+                        list(zip(values.tolist(), counts.tolist())))
+
+    def rebuild(self, chunks: Iterable[pd.DataFrame]) -> None:
+        """Recreate every table from the betting history."""
+        for path in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.last_balance = None
+        self.current_streak = 0
+        self.setup()
+        for chunk in chunks:
+            self.add_chunk(chunk)
+
+    def _query(self, sql: str) -> pd.DataFrame:
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn)
+
+    def hourly(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM rollup_hourly ORDER BY period")
+
+    def daily(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM rollup_daily ORDER BY period")
+
+    def win_loss(self) -> tuple[int, int]:
+        wins, losses = self._query(
+            "SELECT COALESCE(SUM(wins), 0) AS wins, COALESCE(SUM(losses), 0) AS losses FROM rollup_daily"
+        ).iloc[0]
+        return int(wins), int(losses)
+
+    def profit_per_hour(self) -> pd.Series:
+        """Total profit for each hour of the day, indexed by hour."""
+        df = self._query("""
+            SELECT CAST(substr(period, 12, 2) AS INTEGER) AS hour, SUM(profit) AS profit
+            FROM rollup_hourly GROUP BY hour ORDER BY hour
+        """)
+        return df.set_index('hour')['profit']
+
+    def bet_sizes(self) -> tuple[np.ndarray, np.ndarray]:
+        df = self._query("SELECT amount, count FROM rollup_bet_sizes ORDER BY amount")
+        return df['amount'].to_numpy(), df['count'].to_numpy()
+
+    def streak_histogram(self) -> tuple[np.ndarray, np.ndarray]:
+        """Losing streak lengths and counts, including the streak still open."""
+        df = self._query("SELECT length, SUM(count) AS count FROM rollup_streaks GROUP BY length")
+        counts = dict(zip(df['length'].tolist(), df['count'].tolist()))
+        # read the open streak from disk, the bot may have moved on since setup()
+        state = self._query("SELECT value FROM rollup_state WHERE key = 'current_streak'")
+        current_streak = int(state['value'].iloc[0] or 0) if not state.empty else 0
+        if current_streak:
+            counts[current_streak] = counts.get(current_streak, 0) + 1
+        lengths = np.array(sorted(counts), dtype=np.int64)
+        return lengths, np.array([counts[n] for n in lengths.tolist()], dtype=np.int64)
+
+    def capital_curve(self) -> tuple[np.ndarray, np.ndarray]:
+        """Closing balance of every hour against the number of rounds played by then."""
+        df = self._query("SELECT rounds, close_balance FROM rollup_hourly ORDER BY period")
+        return df['rounds'].cumsum().to_numpy(), df['close_balance'].to_numpy()
+
+
+def load_rollups(chunks: Iterable[pd.DataFrame] | None = None) -> Rollups:
+    """
+    Open the rollup tables, rebuilding them from ``chunks`` of history when
+    they don't exist yet.
+    """
+    rollups = Rollups()
+    if rollups.exists():
+        rollups.setup()
+        return rollups
+
+    logging.info("Building rollup tables from the betting history")
+    rollups.rebuild(chunks or [])
+    return rollups
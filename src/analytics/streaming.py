@@ -0,0 +1,191 @@
+"""
+Bounded-memory versions of the analytics.
+
+The betting log is processed in fixed-size chunks with compact dtypes and
+the streak and balance state is carried across chunk boundaries, so peak
+memory depends on the chunk size instead of the length of the history.
+"""
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.analytics import core
+from src.analytics.daily_report import daily_report_from_tracker
+from src.analytics.summary import BetMetricsTracker
+from src.archive import list_partitions
+from src.config import get_config
+from src.ledger import DateLike, Ledger, get_ledger, _select_columns
+
+config = get_config()
+
+OUTCOME_DTYPE = pd.CategoricalDtype(['W', 'L', 'TIE'])
+RESULT_DTYPE = pd.CategoricalDtype(['D', 'T', 'TIE'])
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a chunk to compact dtypes: int64 epoch seconds for timestamp,
+    int32 round_id, int64 amounts and categorical result/outcome. Outcomes
+    and results are upper-cased first, since the in-memory analytics ignore
+    their case and a lower-case value would otherwise become NaN.
+    """
+    out = {}
+    for column in df.columns:
+        values = df[column]
+        if column == 'timestamp':
+            out[column] = pd.to_datetime(values).to_numpy(dtype='datetime64[s]').astype('int64')
+        elif column == 'round_id':
+            out[column] = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='int32')
+        elif column in ('bet_amount', 'balance'):
+            out[column] = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='int64')
+        elif column == 'outcome':
+            out[column] = pd.Categorical(values.astype(str).str.upper(), dtype=OUTCOME_DTYPE)
+        elif column == 'result':
+            out[column] = pd.Categorical(values.astype(str).str.upper(), dtype=RESULT_DTYPE)
+    return pd.DataFrame(out)
+
+
+def iter_chunks(start: DateLike = None, end: DateLike = None,
+                columns: Iterable[str] | None = None,
+                chunksize: int | None = None,
+                ledger: Ledger | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the betting history, archive first and then the live log, as compact
+    chunks of at most ``chunksize`` rows.
+    """
+    columns = _select_columns(columns)
+    chunksize = chunksize or config.analytics.chunk_size
+    ledger = ledger or get_ledger()
+    bounded = start is not None or end is not None
+    load_columns = columns if 'timestamp' in columns or not bounded else ['timestamp'] + columns
+
+    for _, path in list_partitions(start, end):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=load_columns):
+            chunk = batch.to_pandas()
+            if start is not None:
+                chunk = chunk[chunk['timestamp'] >= pd.Timestamp(start)]
+            if end is not None:
+                chunk = chunk[chunk['timestamp'] < pd.Timestamp(end)]
+            if not chunk.empty:
+                yield compact(chunk[columns])
+
+    for chunk in ledger.read_chunks(start, end, columns, chunksize):
+        yield compact(chunk)
+
+
+def stream_bet_metrics(chunks: Iterable[pd.DataFrame] | None = None) -> dict:
+    """Chunked equivalent of :func:`calculate_bet_metrics`."""
+    if chunks is None:
+        chunks = iter_chunks(columns=['bet_amount', 'outcome', 'balance'])
+    tracker = BetMetricsTracker()
+    for chunk in chunks:
+        tracker.update_chunk(chunk['bet_amount'], chunk['outcome'], chunk['balance'])
+    return tracker.metrics()
+
+
+def _day_slices(timestamps: np.ndarray) -> Iterator[tuple[str, slice]]:
+    """Split a chunk of epoch timestamps into runs of the same calendar day."""
+    days = timestamps // SECONDS_PER_DAY
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(days)) + 1, [len(days)]))
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        day = np.datetime64(int(days[first]), 'D').astype(str)
+        yield day, slice(first, last)
+
+
+def stream_daily_reports(chunks: Iterable[pd.DataFrame] | None = None) -> list[dict]:
+    """Chunked equivalent of :func:`daily_reports_from_df`."""
+    if chunks is None:
+        chunks = iter_chunks(columns=['timestamp', 'bet_amount', 'outcome', 'balance'])
+
+    trackers: dict[str, BetMetricsTracker] = {}
+    for chunk in chunks:
+        timestamps = chunk['timestamp'].to_numpy()
+        for day, rows in _day_slices(timestamps):
+            part = chunk.iloc[rows]
+            trackers.setdefault(day, BetMetricsTracker()).update_chunk(
+                part['bet_amount'], part['outcome'], part['balance'])
+
+    return [daily_report_from_tracker(trackers[day], day) for day in sorted(trackers)]
+
+
+class GraphData:
+    """
+    Aggregates needed by the graphs, built chunk by chunk.
+
+    The capital curve keeps at most ``max_points`` balances: when the buffer
+    fills up every other point is dropped and the sampling stride doubles, so
+    long histories are drawn from an evenly thinned series.
+    """
+
+    def __init__(self, max_points: int = 20_000):
+        self.max_points = max_points
+        self.stride = 1
+        self.rounds_seen = 0
+        self.curve_rounds: list[np.ndarray] = []
+        self.curve_balances: list[np.ndarray] = []
+        self.curve_size = 0
+        self.win_count = 0
+        self.loss_count = 0
+        self.bet_counts: dict[int, int] = {}
+        self.hour_profit = np.zeros(24)
+        self.hour_seen = np.zeros(24, dtype=bool)
+        self.last_balance: int | None = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        n = len(chunk)
+        if n == 0:
+            return
+        balances = chunk['balance'].to_numpy()
+
+        rounds = core.round_sequence(n) + self.rounds_seen
+        keep = (rounds - 1) % self.stride == 0
+        self.curve_rounds.append(rounds[keep])
+        self.curve_balances.append(balances[keep])
+        self.curve_size += int(keep.sum())
+        self.rounds_seen += n
+        while self.curve_size > self.max_points:
+            self._thin()
+
+        self.win_count += int((chunk['outcome'] == 'W').sum())
+        self.loss_count += int((chunk['outcome'] == 'L').sum())
+
+        values, counts = np.unique(chunk['bet_amount'].to_numpy(), return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self.bet_counts[value] = self.bet_counts.get(value, 0) + count
+
+        previous = balances[0] if self.last_balance is None else self.last_balance
+        profit = np.diff(balances, prepend=previous).astype(np.float64)
+        hours = (chunk['timestamp'].to_numpy() // 3600) % 24
+        self.hour_profit += np.bincount(hours, weights=profit, minlength=24)
+        self.hour_seen[np.unique(hours)] = True
+        self.last_balance = int(balances[-1])
+
+    def _thin(self) -> None:
+        rounds = np.concatenate(self.curve_rounds)
+        balances = np.concatenate(self.curve_balances)
+        self.stride *= 2
+        keep = (rounds - 1) % self.stride == 0
+        self.curve_rounds = [rounds[keep]]
+        self.curve_balances = [balances[keep]]
+        self.curve_size = int(keep.sum())
+
+    def capital_curve(self) -> tuple[np.ndarray, np.ndarray]:
+        if not self.curve_rounds:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(self.curve_rounds), np.concatenate(self.curve_balances)
+
+    def profit_per_hour(self) -> pd.Series:
+        hours = np.flatnonzero(self.hour_seen)
+        return pd.Series(self.hour_profit[hours], index=pd.Index(hours, name="hour"))
+
+
+def stream_graph_data(chunks: Iterable[pd.DataFrame] | None = None) -> GraphData:
+    if chunks is None:
+        chunks = iter_chunks(columns=['timestamp', 'bet_amount', 'outcome', 'balance'])
+    data = GraphData()
+    for chunk in chunks:
+        data.update(chunk)
+    return data
@@ -1,6 +1,9 @@
+import csv
+import os
 import pandas as pd
 import json
-from typing import Hashable
+from typing import Hashable, Iterable
+from src.analytics import core
 
 
 def calculate_bet_metrics(csv_file_path: str) -> dict:
@@ -45,6 +48,11 @@ def calculate_bet_metrics(csv_file_path: str) -> dict:
         print(f"Error reading CSV file {csv_file_path}: {e}")
         return {}
 
+    return bet_metrics_from_df(df)
+
+
+def bet_metrics_from_df(df: pd.DataFrame) -> dict:
+    """Calculates the same metrics as :func:`calculate_bet_metrics` from a loaded betting log."""
     if df.empty:
         return {
             "Total Rounds": 0,
@@ -57,50 +65,23 @@ def calculate_bet_metrics(csv_file_path: str) -> dict:
             "Profit Percentage": 0.0
         }
 
-    # Ensure 'outcome' column is treated as string and lowercased for comparison
-    df['outcome'] = df['outcome'].astype(str).str.lower()
-    df['bet_amount'] = pd.to_numeric(
+    outcomes = core.as_categorical(df['outcome'])
+    bet_amounts = pd.to_numeric(
         df['bet_amount'], errors='coerce').fillna(0).astype(int)
-    df['balance'] = pd.to_numeric(
+    balances = pd.to_numeric(
         df['balance'], errors='coerce').fillna(0).astype(int)
 
     # 1. Initial Wallet Balance calculation (needed for Total Profit, Profit Percentage)
-    initial_balance = 0.0
-    first_row: pd.Series = df.iloc[0]
-    first_bet_amount = first_row['bet_amount']
-    first_balance_after_bet = first_row['balance']
-    first_outcome = first_row['outcome']
-
-    if first_outcome == 'w':
-        # balance_after = balance_before + bet_amount_won
-        # Assuming bet_amount is the amount won (profit), not total return
-        initial_balance = first_balance_after_bet - first_bet_amount
-    elif first_outcome == 'l':
-        # balance_after = balance_before - bet_amount_lost
-        initial_balance = first_balance_after_bet + first_bet_amount
-    else:
-        # Tie
-        initial_balance = first_balance_after_bet
+    initial_balance = core.start_balance(outcomes, bet_amounts, balances)
 
     # Metrics Calculation
     total_rounds = len(df)
-    wins = df[df['outcome'] == 'w'].shape[0]
-    losses = df[df['outcome'] == 'l'].shape[0]
-    final_wallet_balance = 0.0 if df.empty else df.iloc[-1]['balance']
-
-    max_losing_streak = 0
-    current_losing_streak = 0
-    for outcome in df['outcome']:
-        if outcome in ['l', 'tie']:
-            current_losing_streak += 1
-        else:
-            if current_losing_streak > max_losing_streak:
-                max_losing_streak = current_losing_streak
-            current_losing_streak = 0
-    if current_losing_streak > max_losing_streak:  # Check for a streak ending at the last round
-        max_losing_streak = current_losing_streak
+    wins = int(core.outcome_mask(outcomes, 'w').sum())
+    losses = int(core.outcome_mask(outcomes, 'l').sum())
+    final_wallet_balance = core.end_balance(balances)
+    max_losing_streak = core.max_losing_streak(outcomes)
 
-    max_bet_placed: int = 0 if df.empty else df['bet_amount'].max()
+    max_bet_placed: int = 0 if df.empty else bet_amounts.max()
 
     total_profit = final_wallet_balance - initial_balance
 
@@ -121,6 +102,140 @@ def calculate_bet_metrics(csv_file_path: str) -> dict:
     }
 
 
+def _to_int(value) -> int:
+    """Mirror ``pd.to_numeric(errors='coerce').fillna(0).astype(int)`` for one value."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    if number != number:  # NaN
+        return 0
+    return int(number)
+
+
+class BetMetricsTracker:
+    """
+    Incrementally maintained version of :func:`calculate_bet_metrics`.
+
+    The tracker is loaded once from the betting log and then updated with
+    every logged bet, so producing the summary costs O(1) per round instead
+    of a full re-read of the log. ``metrics()`` returns exactly what
+    ``calculate_bet_metrics`` would return for the same rows.
+    """
+
+    def __init__(self):
+        self.total_rounds = 0
+        self.wins = 0
+        self.losses = 0
+        self.initial_balance = 0.0
+        self.final_balance = 0
+        self.max_bet_placed = 0
+        self.current_losing_streak = 0
+        self.max_losing_streak = 0
+        self.saved_metrics: dict | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "BetMetricsTracker":
+        """Build a tracker from betting log rows in a single pass."""
+        tracker = cls()
+        for row in rows:
+            tracker.update(row.get('bet_amount'), row.get('outcome'), row.get('balance'))
+        return tracker
+
+    @classmethod
+    def from_csv(cls, csv_file_path: str) -> "BetMetricsTracker":
+        """Build a tracker from an existing CSV betting log."""
+        if not os.path.exists(csv_file_path):
+            return cls()
+
+        with open(csv_file_path, 'r', newline='') as csvfile:
+            return cls.from_rows(csv.DictReader(csvfile))
+
+    def update(self, bet_amount, outcome, balance) -> None:
+        """Account for a single logged bet."""
+        bet_amount = _to_int(bet_amount)
+        balance = _to_int(balance)
+        outcome = str(outcome).lower() if outcome not in (None, '') else 'nan'
+
+        if self.total_rounds == 0:
+            if outcome == 'w':
+                self.initial_balance = balance - bet_amount
+            elif outcome == 'l':
+                self.initial_balance = balance + bet_amount
+            else:
+                self.initial_balance = balance
+
+        self.total_rounds += 1
+        if outcome == 'w':
+            self.wins += 1
+        elif outcome == 'l':
+            self.losses += 1
+
+        if outcome in ['l', 'tie']:
+            self.current_losing_streak += 1
+            self.max_losing_streak = max(self.max_losing_streak, self.current_losing_streak)
+        else:
+            self.current_losing_streak = 0
+
+        self.max_bet_placed = max(self.max_bet_placed, bet_amount)
+        self.final_balance = balance
+
+    def update_chunk(self, bet_amounts: pd.Series, outcomes: pd.Series, balances: pd.Series) -> None:
+        """
+        Account for a consecutive block of bets at once, carrying the open
+        losing streak across block boundaries. Amounts and balances must
+        already be integers.
+        """
+        if len(balances) == 0:
+            return
+
+        if self.total_rounds == 0:
+            self.initial_balance = int(core.start_balance(outcomes, bet_amounts, balances))
+
+        self.total_rounds += len(balances)
+        self.wins += int(core.outcome_mask(outcomes, 'w').sum())
+        self.losses += int(core.outcome_mask(outcomes, 'l').sum())
+
+        lengths, self.current_losing_streak = core.carried_run_lengths(
+            core.losing_mask(outcomes), self.current_losing_streak)
+        if lengths.size:
+            self.max_losing_streak = max(self.max_losing_streak, int(lengths.max()))
+
+        self.max_bet_placed = max(self.max_bet_placed, int(bet_amounts.max()))
+        self.final_balance = int(balances.iloc[-1])
+
+    def metrics(self) -> dict:
+        """Return the summary in the same shape as :func:`calculate_bet_metrics`."""
+        if self.total_rounds == 0:
+            return {
+                "Total Rounds": 0,
+                "Wins": 0,
+                "Losses": 0,
+                "Final Wallet Balance": 0.0,
+                "Maximum Losing Streak": 0,
+                "Max Bet Placed": 0.0,
+                "Total Profit": 0.0,
+                "Profit Percentage": 0.0
+            }
+
+        total_profit = self.final_balance - self.initial_balance
+        if self.initial_balance != 0:
+            profit_percentage = (total_profit / self.initial_balance) * 100
+        else:
+            profit_percentage = 0.0
+
+        return {
+            "Total Rounds": self.total_rounds,
+            "Wins": self.wins,
+            "Losses": self.losses,
+            "Final Wallet Balance": float(self.final_balance),
+            "Maximum Losing Streak": self.max_losing_streak,
+            "Max Bet Placed": float(self.max_bet_placed),
+            "Total Profit": float(total_profit),
+            "Profit Percentage": float(profit_percentage),
+        }
+
+
 if __name__ == '__main__':
     # main()
     # metrics = calculate_bet_metrics("data/betting_log.csv")
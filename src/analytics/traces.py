@@ -0,0 +1,106 @@
+"""
+Analysis of the per-cycle trace records in ``data/traces.jsonl``.
+
+Run as a module for a report of the slowest phases and the rounds whose
+betting window was missed:
+
+    python -m src.analytics.traces
+"""
+import json
+import os
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from src.config import get_config
+
+config = get_config()
+
+# skip reasons that mean the round's betting window went by without a bet
+MISSED_REASONS = ('window_not_open', 'window_closed', 'no_round_id', 'failed_bet')
+
+
+def trace_files(path: Optional[str] = None) -> list[str]:
+    """The trace file and its rolled-over backups, oldest first."""
+    path = path or config.tracing.path
+    backups = [f"{path}.{i}" for i in range(config.tracing.backups, 0, -1)]
+    return [p for p in [*backups, path] if os.path.exists(p)]
+
+
+def iter_traces(path: Optional[str] = None) -> Iterator[dict]:
+    for file in trace_files(path):
+        with open(file) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash mid-write
+                    continue
+
+
+def iter_spans(span: dict, depth: int = 0) -> Iterator[tuple[dict, int]]:
+    """Every span under ``span`` with its depth, the cycle's own phases being depth 1."""
+    for child in span.get('spans', []):
+        yield child, depth + 1
+        yield from iter_spans(child, depth + 1)
+
+
+def span_frame(traces: Iterator[dict]) -> pd.DataFrame:
+    """One row per span: round id, span name, depth, start timestamp and duration in ms."""
+    rows = [
+        (trace.get('round_id'), span['name'], depth, span['ts'], span['ms'])
+        for trace in traces
+        for span, depth in iter_spans(trace)
+    ]
+    return pd.DataFrame(rows, columns=['round_id', 'name', 'depth', 'ts', 'ms'])
+
+
+def slowest_phases(spans: pd.DataFrame, depth: Optional[int] = 1, top: int = 15) -> pd.DataFrame:
+    """
+    Duration statistics per span name, slowest p95 first. ``depth=1`` limits
+    it to the cycle's phases, ``None`` includes driver commands and other
+    nested spans.
+    """
+    if depth is not None:
+        spans = spans[spans['depth'] == depth]
+    stats = spans.groupby('name')['ms'].agg(
+        count='count',
+        p50=lambda ms: ms.quantile(0.5),
+        p95=lambda ms: ms.quantile(0.95),
+        max='max',
+        total='sum',
+    )
+    return stats.sort_values('p95', ascending=False).head(top).round(1)
+
+
+def missed_windows(traces: Iterator[dict]) -> pd.DataFrame:
+    """Cycles that skipped their round for lack of a bet in the window, with their slowest phase."""
+    rows = []
+    for trace in traces:
+        if trace.get('skipped') not in MISSED_REASONS:
+            continue
+        phases = trace.get('spans', [])
+        slowest = max(phases, key=lambda span: span['ms'] or 0, default=None)
+        rows.append({
+            'timestamp': pd.to_datetime(trace['ts'], unit='s'),
+            'round_id': trace.get('round_id'),
+            'reason': trace['skipped'],
+            'cycle_ms': trace['ms'],
+            'slowest_phase': slowest['name'] if slowest else None,
+            'slowest_ms': slowest['ms'] if slowest else None,
+        })
+    return pd.DataFrame(rows, columns=['timestamp', 'round_id', 'reason', 'cycle_ms',
+                                       'slowest_phase', 'slowest_ms'])
+
+
+if __name__ == "__main__":
+    traces = list(iter_traces())
+    print(f"{len(traces)} traced cycles\n")
+    print("Slowest phases (ms):")
+    print(slowest_phases(span_frame(traces)).to_string())
+    print("\nSlowest nested spans (ms):")
+    print(slowest_phases(span_frame(traces), depth=None).to_string())
+    missed = missed_windows(traces)
+    print(f"\n{len(missed)} missed betting windows:")
+    if not missed.empty:
+        print(missed.to_string(index=False))
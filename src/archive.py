@@ -0,0 +1,177 @@
+import csv
+import io
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from src.config import get_config
+from src.ledger import COLUMNS, DateLike, Ledger, get_ledger, _select_columns
+
+config = get_config()
+
+PARTITION_PREFIX = 'date='
+PARTITION_FILE = 'part-0.parquet'
+
+# Typed columns stored in the archive
+DTYPES = {
+    'round_id': 'int64',
+    'bet_amount': 'int64',
+    'result': 'category',
+    'outcome': 'category',
+    'balance': 'int64',
+}
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    for column in ('round_id', 'bet_amount', 'balance'):
+        df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0)
+    return df.astype(DTYPES)
+
+
+def _partition_path(archive_dir: str, day: str) -> str:
+    return os.path.join(archive_dir, f"{PARTITION_PREFIX}{day}", PARTITION_FILE)
+
+
+def list_partitions(start: DateLike = None, end: DateLike = None,
+                    archive_dir: str | None = None) -> list[tuple[str, str]]:
+    """
+    Return ``(day, path)`` of the archived days overlapping ``[start, end)``,
+    oldest first. Days outside the range are pruned without being opened.
+    """
+    archive_dir = archive_dir or config.storage.archive_dir
+    if not os.path.isdir(archive_dir):
+        return []
+
+    first_day = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+    end_ts = pd.Timestamp(end) if end is not None else None
+
+    partitions = []
+    for name in sorted(os.listdir(archive_dir)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        day = name[len(PARTITION_PREFIX):]
+        if first_day is not None and day < first_day:
+            continue
+        if end_ts is not None and pd.Timestamp(day) >= end_ts:
+            continue
+        path = os.path.join(archive_dir, name, PARTITION_FILE)
+        if os.path.exists(path):
+            partitions.append((day, path))
+    return partitions
+
+
+def read_archive(start: DateLike = None, end: DateLike = None,
+                 columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """
+    Read archived bets with ``start <= timestamp < end``.
+
+    Only the partitions inside the date range are opened and only ``columns``
+    are loaded from them.
+    """
+    columns = _select_columns(columns)
+    bounded = start is not None or end is not None
+    load_columns = columns if 'timestamp' in columns or not bounded else ['timestamp'] + columns
+
+    frames = []
+    for _, path in list_partitions(start, end):
+        df = pd.read_parquet(path, columns=load_columns)
+        if start is not None:
+            df = df[df['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['timestamp'] < pd.Timestamp(end)]
+        if not df.empty:
+            frames.append(df[columns])
+
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype='datetime64[ns]' if c == 'timestamp' else DTYPES[c])
+                             for c in columns})
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_bets(start: DateLike = None, end: DateLike = None,
+              columns: Iterable[str] | None = None,
+              ledger: Ledger | None = None) -> pd.DataFrame:
+    """Read bets with ``start <= timestamp < end`` from the archive and the live log."""
+    ledger = ledger or get_ledger()
+    archived = read_archive(start, end, columns)
+    live = ledger.read(start=start, end=end, columns=columns)
+    if archived.empty:
+        return live
+    if live.empty:
+        return archived
+    return pd.concat([archived, live], ignore_index=True)
+
+
+def first_bet_date(ledger: Ledger | None = None) -> str | None:
+    """Day of the oldest bet, archived or live, as 'YYYY-MM-DD'; None when nothing was logged."""
+    partitions = list_partitions()
+    if partitions:
+        return partitions[0][0]
+    first = (ledger or get_ledger()).first_timestamp()
+    return first.strftime('%Y-%m-%d') if first is not None else None
+
+
+def iter_rows(ledger: Ledger | None = None) -> Iterator[dict]:
+    """Yield every bet, archived days first, then the live log."""
+    ledger = ledger or get_ledger()
+    for _, path in list_partitions():
+        df = pd.read_parquet(path)
+        df['timestamp'] = df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        yield from df.astype(object).to_dict('records')
+    yield from ledger.iter_rows()
+
+
+def export_csv(ledger: Ledger | None = None) -> bytes:
+    """Full betting history, archive included, as CSV bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for row in iter_rows(ledger):
+        writer.writerow([row[c] for c in COLUMNS])
+    return buffer.getvalue().encode()
+
+
+def compact(ledger: Ledger | None = None, cutoff: DateLike = None,
+            archive_dir: str | None = None) -> int:
+    """
+    Move every closed day (rows before ``cutoff``, by default today's midnight)
+    out of the live log into ``<archive_dir>/date=YYYY-MM-DD/part-0.parquet``.
+
+    A day that is already archived is merged and de-duplicated, so re-running
+    after an interrupted compaction is safe. Returns the number of moved rows.
+    """
+    ledger = ledger or get_ledger()
+    archive_dir = archive_dir or config.storage.archive_dir
+    cutoff = pd.Timestamp(cutoff) if cutoff is not None else pd.Timestamp(datetime.now().date())
+
+    closed = ledger.read(end=cutoff)
+    if closed.empty:
+        return 0
+
+    closed = _typed(closed)
+    for day, day_df in closed.groupby(closed['timestamp'].dt.strftime('%Y-%m-%d'), sort=True):
+        path = _partition_path(archive_dir, str(day))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            day_df = pd.concat([pd.read_parquet(path), day_df], ignore_index=True)
+            day_df = _typed(day_df.drop_duplicates(subset=['timestamp', 'round_id']))
+
+        tmp_path = path + '.tmp'
+        day_df.sort_values('timestamp', kind='stable').to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    ledger.delete_before(cutoff)
+    logging.info(f"Archived {len(closed)} bets from before {cutoff.date()}")
+    return len(closed)
+
+
+if __name__ == "__main__":
+    # python -m src.archive [YYYY-MM-DD]  -> archive every day before the given date (default today)
+    moved = compact(cutoff=sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Archived {moved} rows into {config.storage.archive_dir}")
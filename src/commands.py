@@ -0,0 +1,99 @@
+"""
+Accounting of the WebDriver commands the bot sends to chromedriver.
+
+With ``[METRICS] count_driver_commands`` on, every HTTP command going
+through the driver's command executor is timed by command name, counted by
+the bot function that caused it (including the lambdas polled by
+``WebDriverWait``) and summed per betting cycle, all on the metrics surface.
+"""
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src.config import get_config
+from src.metrics import get_metrics
+from src.tracing import annotate
+
+config = get_config()
+metrics = get_metrics()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# wrappers that sit between the bot's code and the command executor
+SKIPPED_FILES = {os.path.abspath(__file__), os.path.join(ROOT, 'src', 'tracing.py')}
+
+
+def _caller() -> str:
+    """``module.function`` of the innermost frame in the bot's own code."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(ROOT) and filename not in SKIPPED_FILES and 'site-packages' not in filename:
+            module = os.path.splitext(filename[len(ROOT):])[0].replace(os.sep, '.')
+            return f"{module}.{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class CommandAccounting:
+    """Counts and times commands; :meth:`cycle` brackets one betting cycle's share of them."""
+
+    def __init__(self):
+        self.cycle_counts: Counter[str] = Counter()
+
+    def install(self, driver: WebDriver) -> None:
+        """Wrap the command executor of ``driver``, once."""
+        executor = driver.command_executor
+        if getattr(executor, '_accounted', False):
+            return
+        execute = executor.execute
+
+        def accounted_execute(command, params):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                metrics.observe(command, time.perf_counter() - start, "driver_command_seconds")
+                metrics.inc("driver_commands", command=command, caller=_caller())
+                self.cycle_counts[command] += 1
+
+        executor.execute = accounted_execute
+        executor._accounted = True
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        self.cycle_counts.clear()
+        try:
+            yield
+        finally:
+            counts = dict(self.cycle_counts)
+            metrics.observe("all", sum(counts.values()), "cycle_driver_commands")
+            for command, count in counts.items():
+                metrics.observe(command, count, "cycle_driver_commands")
+            annotate(driver_commands=counts)
+
+
+@lru_cache
+def get_accounting() -> CommandAccounting:
+    return CommandAccounting()
+
+
+def count_commands(driver: WebDriver) -> None:
+    """Start accounting for ``driver`` if ``[METRICS] count_driver_commands`` is on."""
+    if config.metrics.count_driver_commands:
+        get_accounting().install(driver)
+
+
+@contextmanager
+def cycle_commands() -> Iterator[None]:
+    """Sum the commands sent inside the ``with`` block as one cycle, when accounting is on."""
+    if not config.metrics.count_driver_commands:
+        yield
+        return
+    with get_accounting().cycle():
+        yield
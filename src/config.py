@@ -29,6 +29,7 @@ class Break:
 class Behaviour:
     pause_min: int
     pause_max: int
+    result_timeout: int
 
 @dataclass
 class Sleep:
@@ -39,6 +40,8 @@ class Sleep:
 class Notification:
     balance_threshold: int
     loss_streak_threshold: int
+    cooldown: int
+    balance_clear_margin: int
     
 @dataclass
 class Telegram:
@@ -47,6 +50,83 @@ class Telegram:
     bot_token: str
     admin_username: str
 
+@dataclass
+class Storage:
+    backend: str
+    sqlite_path: str
+    archive_enabled: bool
+    archive_dir: str
+    rollup_path: str
+
+@dataclass
+class Analytics:
+    streaming: bool
+    chunk_size: int
+
+@dataclass
+class Browser:
+    state_source: str
+    feed_stale_after: int
+    reuse: bool
+    park_url: str
+    session_path: str
+    profile_dir: str
+    driver_cache_dir: str
+    low_cpu: bool
+    memory_limit_mb: int
+    memory_check_interval: int
+
+@dataclass
+class Metrics:
+    enabled: bool
+    host: str
+    port: int
+    dump_path: str
+    dump_interval: int
+    count_driver_commands: bool
+
+@dataclass
+class Tracing:
+    enabled: bool
+    path: str
+    max_bytes: int
+    backups: int
+
+@dataclass
+class Profiler:
+    enabled: bool
+    control_file: str
+    poll_interval: float
+    duration: float
+    interval_ms: float
+    output_dir: str
+
+@dataclass
+class Logging:
+    format: str
+    rotation: str
+    max_bytes: int
+    when: str
+    backups: int
+    compress: bool
+
+@dataclass
+class Startup:
+    import_budget_ms: int
+
+@dataclass
+class AlertRule:
+    name: str
+    type: str
+    metric: str
+    direction: str
+    trigger: float
+    clear: float
+    window: int
+    cooldown: int
+
+ALERT_TYPES = ("threshold", "change", "drawdown", "streak")
+
 class Config:
     def __init__(self):
         self.config = ConfigParser()
@@ -60,6 +140,15 @@ class Config:
         self.sleep = self._get_sleep()
         self.notification = self._get_notification()
         self.telegram = self._get_telegram()
+        self.storage = self._get_storage()
+        self.analytics = self._get_analytics()
+        self.browser = self._get_browser()
+        self.alerts = self._get_alerts()
+        self.metrics = self._get_metrics()
+        self.tracing = self._get_tracing()
+        self.profiler = self._get_profiler()
+        self.logging = self._get_logging()
+        self.startup = self._get_startup()
 
     def _get_login(self):
         return Login(
@@ -91,7 +180,8 @@ class Config:
     def _get_behaviour(self):
         return Behaviour(
             pause_min=int(self.config["BEHAVIOUR"]["pause_min"]),
-            pause_max=int(self.config["BEHAVIOUR"]["pause_max"])
+            pause_max=int(self.config["BEHAVIOUR"]["pause_max"]),
+            result_timeout=self.config.getint("BEHAVIOUR", "result_timeout", fallback=60)
         )
 
     def _get_sleep(self):
@@ -103,7 +193,9 @@ class Config:
     def _get_notification(self):
         return Notification(
             balance_threshold=int(self.config["NOTIFICATION"]["balance_threshold"]),
-            loss_streak_threshold=int(self.config["NOTIFICATION"]["loss_streak_threshold"])
+            loss_streak_threshold=int(self.config["NOTIFICATION"]["loss_streak_threshold"]),
+            cooldown=self.config.getint("NOTIFICATION", "cooldown", fallback=300),
+            balance_clear_margin=self.config.getint("NOTIFICATION", "balance_clear_margin", fallback=10)
         )
 
     def _get_telegram(self):
@@ -113,7 +205,121 @@ class Config:
             bot_token=self.config["TELEGRAM"]["bot_token"],
             admin_username=self.config["TELEGRAM"]["admin_username"]
         )
-    
+
+    def _get_storage(self):
+        return Storage(
+            backend=self.config.get("STORAGE", "backend", fallback="csv").strip().lower(),
+            sqlite_path=self.config.get("STORAGE", "sqlite_path", fallback="data/betting_log.db"),
+            archive_enabled=self.config.getboolean("STORAGE", "archive_enabled", fallback=False),
+            archive_dir=self.config.get("STORAGE", "archive_dir", fallback="data/archive"),
+            rollup_path=self.config.get("STORAGE", "rollup_path", fallback="data/rollups.db")
+        )
+
+
+    def _get_analytics(self):
+        return Analytics(
+            streaming=self.config.getboolean("ANALYTICS", "streaming", fallback=False),
+            chunk_size=self.config.getint("ANALYTICS", "chunk_size", fallback=100_000)
+        )
+
+    def _get_browser(self):
+        return Browser(
+            state_source=self.config.get("BROWSER", "state_source", fallback="dom").strip().lower(),
+            feed_stale_after=self.config.getint("BROWSER", "feed_stale_after", fallback=30),
+            reuse=self.config.getboolean("BROWSER", "reuse", fallback=True),
+            park_url=self.config.get("BROWSER", "park_url", fallback="about:blank").strip(),
+            session_path=self.config.get("BROWSER", "session_path", fallback="internal/session.json"),
+            profile_dir=self.config.get("BROWSER", "profile_dir", fallback="internal/chrome-profile").strip(),
+            driver_cache_dir=self.config.get("BROWSER", "driver_cache_dir", fallback="internal/chromedriver").strip(),
+            low_cpu=self.config.getboolean("BROWSER", "low_cpu", fallback=False),
+            memory_limit_mb=self.config.getint("BROWSER", "memory_limit_mb", fallback=1500),
+            memory_check_interval=self.config.getint("BROWSER", "memory_check_interval", fallback=60)
+        )
+
+    def _get_alert(self, section: str) -> AlertRule:
+        name = section.split(":", 1)[1].strip()
+        kind = self.config.get(section, "type", fallback="threshold").strip().lower()
+        if kind not in ALERT_TYPES:
+            raise ValueError(f"[{section}] type must be one of {', '.join(ALERT_TYPES)}, not {kind!r}")
+        metric = self.config.get(section, "metric", fallback="loss_streak" if kind == "streak" else "balance").strip().lower()
+        # balance thresholds and changes alert on a fall, drawdowns and streaks on a rise
+        rising = kind in ("drawdown", "streak") or metric == "loss_streak"
+        trigger = self.config.getfloat(section, "trigger")
+        return AlertRule(
+            name=name,
+            type=kind,
+            metric=metric,
+            direction=self.config.get(section, "direction", fallback="above" if rising else "below").strip().lower(),
+            trigger=trigger,
+            clear=self.config.getfloat(section, "clear", fallback=trigger),
+            window=self.config.getint(section, "window", fallback=10),
+            cooldown=self.config.getint(section, "cooldown", fallback=self.notification.cooldown)
+        )
+
+    def _get_alerts(self):
+        # the two [NOTIFICATION] thresholds, edited from the Config page, are always on
+        notification = self.notification
+        # re-armed only once the balance is the margin back above the threshold, so
+        # hovering around it doesn't alert on every crossing
+        balance_clear = notification.balance_threshold + notification.balance_threshold * notification.balance_clear_margin / 100
+        rules = [
+            AlertRule("balance_low", "threshold", "balance", "below",
+                      notification.balance_threshold, balance_clear, 10, notification.cooldown),
+            AlertRule("loss_streak", "streak", "loss_streak", "above",
+                      notification.loss_streak_threshold, 1, 10, notification.cooldown),
+        ]
+        for section in self.config.sections():
+            if not section.startswith("ALERT:"):
+                continue
+            rule = self._get_alert(section)
+            if rule.name in ("balance_low", "loss_streak"):
+                raise ValueError(f"[{section}] is set by [NOTIFICATION], use another name")
+            rules.append(rule)
+        return rules
+
+    def _get_metrics(self):
+        return Metrics(
+            enabled=self.config.getboolean("METRICS", "enabled", fallback=True),
+            host=self.config.get("METRICS", "host", fallback="127.0.0.1").strip(),
+            port=self.config.getint("METRICS", "port", fallback=9108),
+            dump_path=self.config.get("METRICS", "dump_path", fallback="data/metrics.json").strip(),
+            dump_interval=self.config.getint("METRICS", "dump_interval", fallback=60),
+            count_driver_commands=self.config.getboolean("METRICS", "count_driver_commands", fallback=False)
+        )
+
+    def _get_tracing(self):
+        return Tracing(
+            enabled=self.config.getboolean("TRACING", "enabled", fallback=True),
+            path=self.config.get("TRACING", "path", fallback="data/traces.jsonl").strip(),
+            max_bytes=self.config.getint("TRACING", "max_mb", fallback=20) * 1024 * 1024,
+            backups=self.config.getint("TRACING", "backups", fallback=5)
+        )
+
+    def _get_profiler(self):
+        return Profiler(
+            enabled=self.config.getboolean("PROFILER", "enabled", fallback=True),
+            control_file=self.config.get("PROFILER", "control_file", fallback="internal/profile.request").strip(),
+            poll_interval=self.config.getfloat("PROFILER", "poll_interval", fallback=2),
+            duration=self.config.getfloat("PROFILER", "duration", fallback=30),
+            interval_ms=self.config.getfloat("PROFILER", "interval_ms", fallback=5),
+            output_dir=self.config.get("PROFILER", "output_dir", fallback="internal/profiles").strip()
+        )
+
+    def _get_logging(self):
+        return Logging(
+            format=self.config.get("LOGGING", "format", fallback="text").strip().lower(),
+            rotation=self.config.get("LOGGING", "rotation", fallback="size").strip().lower(),
+            max_bytes=self.config.getint("LOGGING", "max_mb", fallback=10) * 1024 * 1024,
+            when=self.config.get("LOGGING", "when", fallback="midnight").strip(),
+            backups=self.config.getint("LOGGING", "backups", fallback=7),
+            compress=self.config.getboolean("LOGGING", "compress", fallback=True)
+        )
+
+    def _get_startup(self):
+        return Startup(
+            import_budget_ms=self.config.getint("STARTUP", "import_budget_ms", fallback=3500)
+        )
+
 @lru_cache
 def get_config():
     return Config()
@@ -0,0 +1,223 @@
+"""
+Game state read from the page's WebSocket traffic instead of the DOM.
+
+Chrome's performance log carries every ``Network.webSocketFrameReceived``
+event. The frames are parsed for round ids, betting window changes, results
+and balance updates, which are kept as a :class:`FeedState` and handed out as
+:class:`FeedEvent` lists. Anything the frames don't provide is left as None so
+callers fall back to the DOM getters in ``src.info``.
+"""
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import undetected_chromedriver as uc
+
+from src.config import get_config
+from src.info import PageSnapshot
+
+config = get_config()
+
+# Keys looked for, at any depth, in a decoded frame; matched case-insensitively
+ROUND_KEYS = {'roundid', 'round_id', 'rid', 'mid', 'gameid'}
+RESULT_KEYS = {'result', 'winner', 'win'}
+STATUS_KEYS = {'status', 'gamestatus', 'state'}
+BALANCE_KEYS = {'balance', 'bal', 'walletbalance'}
+
+RESULT_VALUES = {
+    'd': 'D', 'a': 'D', 'dragon': 'D',
+    't': 'T', 'b': 'T', 'tiger': 'T',
+    'tie': 'TIE', 'tied': 'TIE',
+}
+OPEN_VALUES = {'open', 'opened', 'betting', 'bet_open', 'start', 'started', 'active'}
+CLOSED_VALUES = {'close', 'closed', 'suspended', 'suspend', 'bet_closed', 'stop', 'stopped', 'result'}
+
+MAX_RESULTS = 100
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    # 'round', 'window', 'result' or 'balance'
+    kind: str
+    value: Any
+    # time.monotonic() when the frame was read
+    at: float
+
+
+@dataclass
+class FeedState:
+    round_id: Optional[int] = None
+    betting_open: Optional[bool] = None
+    # newest first, as 'D', 'T' or 'TIE'
+    results: list[str] = field(default_factory=list)
+    balance: Optional[int] = None
+    # round the newest result belongs to, so re-sent result frames are not counted twice
+    result_round: Optional[int] = None
+    updated_at: Optional[float] = None
+    # when a frame last carried a round id and a window status, changed or not
+    round_seen_at: Optional[float] = None
+    window_seen_at: Optional[float] = None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _walk(data: Any, at: float, events: list[FeedEvent]) -> None:
+    if isinstance(data, list):
+        for item in data:
+            _walk(item, at, events)
+        return
+    if not isinstance(data, dict):
+        return
+
+    for key, value in data.items():
+        name = str(key).lower()
+        if isinstance(value, (dict, list)):
+            _walk(value, at, events)
+        elif name in ROUND_KEYS and _to_int(value) is not None:
+            events.append(FeedEvent('round', _to_int(value), at))
+        elif name in RESULT_KEYS and str(value).lower() in RESULT_VALUES:
+            events.append(FeedEvent('result', RESULT_VALUES[str(value).lower()], at))
+        elif name in STATUS_KEYS and str(value).lower() in OPEN_VALUES:
+            events.append(FeedEvent('window', True, at))
+        elif name in STATUS_KEYS and str(value).lower() in CLOSED_VALUES:
+            events.append(FeedEvent('window', False, at))
+        elif name in BALANCE_KEYS and _to_int(value) is not None:
+            events.append(FeedEvent('balance', _to_int(value), at))
+
+
+def parse_frame(payload: str, at: float | None = None) -> list[FeedEvent]:
+    """
+    Events found in one WebSocket text frame. Socket.IO/Engine.IO packet type
+    prefixes are stripped; frames that aren't JSON yield nothing.
+    """
+    at = time.monotonic() if at is None else at
+    text = payload.lstrip('0123456789')
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+    events: list[FeedEvent] = []
+    _walk(data, at, events)
+    return events
+
+
+class WebSocketFeed:
+    """
+    Game state kept current from the WebSocket frames in the driver's
+    performance log. The driver must be created with
+    ``goog:loggingPrefs = {'performance': 'ALL'}``, see :func:`enable_performance_log`.
+    """
+
+    def __init__(self, driver: uc.Chrome, stale_after: float | None = None):
+        self.driver = driver
+        self.stale_after = stale_after or config.browser.feed_stale_after
+        self.state = FeedState()
+        self.frames = 0
+        self.unparsed = 0
+
+    def poll(self) -> list[FeedEvent]:
+        """Read the frames received since the last call and return the state changes they carry."""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logging.error(f'Could not read the performance log: {e}')
+            return []
+
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get('method') != 'Network.webSocketFrameReceived':
+                continue
+            payload = message.get('params', {}).get('response', {}).get('payloadData', '')
+            self.frames += 1
+            parsed = parse_frame(payload)
+            if not parsed:
+                self.unparsed += 1
+            events.extend(e for e in parsed if self._apply(e))
+        return events
+
+    def _apply(self, event: FeedEvent) -> bool:
+        """Update the state; returns False when the event didn't change anything."""
+        state = self.state
+        state.updated_at = event.at
+        if event.kind == 'round':
+            state.round_seen_at = event.at
+            if event.value == state.round_id:
+                return False
+            state.round_id = event.value
+        elif event.kind == 'window':
+            state.window_seen_at = event.at
+            if event.value == state.betting_open:
+                return False
+            state.betting_open = event.value
+        elif event.kind == 'balance':
+            if event.value == state.balance:
+                return False
+            state.balance = event.value
+        elif event.kind == 'result':
+            if state.round_id is not None and state.round_id == state.result_round:
+                return False
+            state.result_round = state.round_id
+            state.results = [event.value, *state.results[:MAX_RESULTS - 1]]
+        return True
+
+    def healthy(self) -> bool:
+        """
+        Whether frames carrying both the round id and the betting window
+        arrived recently enough to trust the state; frames matching only
+        other keys don't count.
+        """
+        state = self.state
+        now = time.monotonic()
+        return all(seen is not None and now - seen <= self.stale_after
+                   for seen in (state.round_seen_at, state.window_seen_at))
+
+    def snapshot(self) -> PageSnapshot:
+        """The feed state in the shape of a DOM snapshot; unknown fields are None."""
+        state = self.state
+        suspended = None if state.betting_open is None else not state.betting_open
+        return PageSnapshot(
+            round_id=state.round_id,
+            balance=state.balance,
+            results=list(state.results),
+            dragon_suspended=suspended,
+            tiger_suspended=suspended,
+        )
+
+    def wait_for_result(self, timeout: float, poll: float = 0.2,
+                        on_event: Callable[[str, Any], None] | None = None) -> Optional[list[str]]:
+        """
+        Block until a result frame arrives and return the results seen so far,
+        newest first. Returns None on timeout or as soon as the feed goes
+        stale, so the caller can fall back to the DOM. ``on_event(kind, value)``
+        is called for every state change on the way.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for event in self.poll():
+                if on_event is not None:
+                    on_event(event.kind, event.value)
+                if event.kind == 'result':
+                    logging.info(f'Got result from feed : {event.value}')
+                    return list(self.state.results)
+            if not self.healthy():
+                return None
+            time.sleep(poll)
+        return None
+
+
+def enable_performance_log(options: uc.ChromeOptions) -> None:
+    """Ask Chrome to record network events, WebSocket frames included, in the performance log."""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
@@ -1,8 +1,10 @@
 import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
 result_map = {
     'a': 'D',
@@ -10,46 +12,226 @@ result_map = {
     'tie': 'TIE'
 }
 
+# Reads everything a betting cycle needs from the game page in one round trip
+SNAPSHOT_SCRIPT = """
+const text = (el) => el ? (el.innerText || el.textContent || '').trim() : null;
+const balance = Array.from(document.querySelectorAll('span.balance-value'))
+    .find((el) => (el.textContent || '').includes('pts'));
+const RESULT_CLASSES = ['resulta', 'resultb', 'resulttie'];
+const container = document.querySelector('.casino-video-last-results');
+const results = container
+    ? Array.from(container.querySelectorAll('span.resulta, span.resultb, span.resulttie'))
+        .map((el) => Array.from(el.classList).find((c) => RESULT_CLASSES.includes(c)))
+    : [];
+const suspended = (selector) => {
+    const box = document.querySelector(selector);
+    return box ? box.classList.contains('suspended') : null;
+};
+const reconnect = Array.from(document.querySelectorAll('button'))
+    .some((el) => (el.textContent || '').trim() === 'Reconnect');
+return {
+    round_id: text(document.querySelector('div.casino-video-rid')),
+    balance: text(balance),
+    results: results,
+    dragon_suspended: suspended('div.dragon-box'),
+    tiger_suspended: suspended('div.tiger-box'),
+    reconnect: reconnect,
+    toast: text(document.querySelector('div.toast-body')),
+};
+"""
+
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    """State of the game page read by :func:`snapshot`; fields are None when the element is missing."""
+    round_id: Optional[int] = None
+    balance: Optional[int] = None
+    # newest first, as 'D', 'T' or 'TIE'; None for an unrecognised result
+    results: list[Optional[str]] = field(default_factory=list)
+    dragon_suspended: Optional[bool] = None
+    tiger_suspended: Optional[bool] = None
+    reconnect_visible: bool = False
+    toast: Optional[str] = None
+
+    @property
+    def last_result(self) -> Optional[str]:
+        return self.results[0] if self.results else None
+
+
+# Installs (or re-installs, when the page re-rendered the watched nodes) a
+# MutationObserver on the results container, the round id and the dragon box
+# (whose 'suspended' class marks the betting window), then hands back
+# the queued events, blocking page-side until one arrives or the timeout ends.
+# Returns null when the page has nothing to observe yet.
+OBSERVER_SCRIPT = """
+const timeout = arguments[0];
+const done = arguments[arguments.length - 1];
+const s = window.__betObserver = window.__betObserver || {queue: [], waiter: null, observer: null, nodes: []};
+const RESULT_CLASSES = ['resulta', 'resultb', 'resulttie'];
+const readResults = (container) => Array.from(
+    container.querySelectorAll('span.resulta, span.resultb, span.resulttie'))
+    .map((el) => Array.from(el.classList).find((c) => RESULT_CLASSES.includes(c)));
+const readRound = (rid) => (rid.innerText || rid.textContent || '').trim();
+const readOpen = (box) => box ? !box.classList.contains('suspended') : null;
+
+if (!s.observer || !s.nodes.length || !s.nodes.every((n) => n.isConnected)) {
+    if (s.observer) s.observer.disconnect();
+    const container = document.querySelector('.casino-video-last-results');
+    const rid = document.querySelector('div.casino-video-rid');
+    const box = document.querySelector('div.dragon-box');
+    if (!container || !rid) { done(null); return; }
+    s.nodes = [container, rid, box].filter(Boolean);
+    s.results = readResults(container).join(',');
+    s.round = readRound(rid);
+    s.open = readOpen(box);
+    s.push = (event) => {
+        s.queue.push(event);
+        if (s.waiter) { const waiter = s.waiter; s.waiter = null; waiter(s.queue.splice(0)); }
+    };
+    s.observer = new MutationObserver(() => {
+        const results = readResults(container);
+        if (results.join(',') !== s.results) {
+            s.results = results.join(',');
+            s.push({kind: 'result', results: results, at: Date.now()});
+        }
+        const round = readRound(rid);
+        if (round !== s.round) {
+            s.round = round;
+            s.push({kind: 'round', value: round, at: Date.now()});
+        }
+        const open = readOpen(box);
+        if (open !== s.open) {
+            s.open = open;
+            s.push({kind: 'window', value: open, at: Date.now()});
+        }
+    });
+    const options = {childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['class']};
+    s.nodes.forEach((node) => s.observer.observe(node, options));
+}
+
+if (s.queue.length || timeout <= 0) { done(s.queue.splice(0)); return; }
+const timer = setTimeout(() => { s.waiter = null; done([]); }, timeout);
+s.waiter = (events) => { clearTimeout(timer); done(events); };
+"""
+
+
+@dataclass(frozen=True)
+class PageEvent:
+    """A change seen by the injected observer: a new result, round id or betting window state."""
+    # 'result', 'round' or 'window'
+    kind: str
+    # newest result ('D', 'T' or 'TIE'), the round id text or whether the window is open
+    value: Optional[str | bool]
+    # full results list after the change, newest first; empty for round events
+    results: list[Optional[str]]
+    # page clock, epoch milliseconds
+    at: float
+
+
+def _parse_int(text: Optional[str], prefix: str) -> Optional[int]:
+    if not text:
+        return None
+    try:
+        return int(text.replace(prefix, ""))
+    except ValueError:
+        return None
+
 
-def get_last_result(driver: uc.Chrome):
+def _parse_results(classes: Optional[list]) -> list[Optional[str]]:
+    """Results from their span classes, newest first; None for a class that isn't a known result."""
+    return [result_map.get((c or '').replace('result', '', 1)) for c in classes or []]
+
+
+def snapshot(driver: uc.Chrome) -> PageSnapshot:
+    """Read the game page state with a single ``execute_script`` call."""
+    raw = driver.execute_script(SNAPSHOT_SCRIPT) or {}
+    return PageSnapshot(
+        round_id=_parse_int(raw.get('round_id'), "Round ID: "),
+        balance=_parse_int(raw.get('balance'), "pts: : "),
+        results=_parse_results(raw.get('results')),
+        dragon_suspended=raw.get('dragon_suspended'),
+        tiger_suspended=raw.get('tiger_suspended'),
+        reconnect_visible=bool(raw.get('reconnect')),
+        toast=raw.get('toast'),
+    )
+
+
+def wait_for_snapshot(driver: uc.Chrome, ready: Callable[[PageSnapshot], object],
+                      timeout: float = 10, poll: float = 0.5) -> PageSnapshot:
+    """Take snapshots until ``ready(snapshot)`` is truthy, raising ``TimeoutException`` after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        snap = snapshot(driver)
+        if ready(snap):
+            return snap
+        if time.monotonic() >= deadline:
+            raise TimeoutException(f"Page not ready after {timeout} seconds")
+        time.sleep(poll)
+
+
+def get_last_result(driver: uc.Chrome, snap: Optional[PageSnapshot] = None):
     logging.info("Getting last result")
 
     try:
-        last_res = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[contains(@class, 'casino-video-last-results')]//span[1]"))
-        )
-        classname = last_res.get_attribute("class")
-        classname = classname.replace('result', '')
-        return result_map[classname]
+        if snap is None or snap.last_result is None:
+            snap = wait_for_snapshot(driver, lambda s: s.last_result)
+        return snap.last_result
     except Exception as e:
         logging.error('Could not get last result')
         # logging.error(e)
         # return None
         raise e
-    
-def get_current_balance(driver: uc.Chrome):
+
+def get_current_balance(driver: uc.Chrome, snap: Optional[PageSnapshot] = None):
     logging.info("Getting current balance")
     try:
-        balance = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//span[contains(@class, "balance-value") and contains(text(), "pts")]'))
-        )
-        return int(balance.text.replace("pts: : ", ""))
+        if snap is None or snap.balance is None:
+            snap = wait_for_snapshot(driver, lambda s: s.balance is not None)
+        return snap.balance
     except Exception as e:
         logging.error('Could not get current balance')
         logging.error(e)
         return None
 
-def get_round_id(driver: uc.Chrome):
+def get_round_id(driver: uc.Chrome, snap: Optional[PageSnapshot] = None):
     logging.info("Getting round id")
     try:
-        round_id = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//div[contains(@class, "casino-video-rid")]'))
-        )
-        return int(round_id.text.replace("Round ID: ", ""))
+        if snap is None or snap.round_id is None:
+            snap = wait_for_snapshot(driver, lambda s: s.round_id is not None)
+        return snap.round_id
     except Exception as e:
         logging.error('Could not get round id')
         logging.error(e)
-        return None
\ No newline at end of file
+        return None
+
+
+def next_page_events(driver: uc.Chrome, timeout: float) -> Optional[list[PageEvent]]:
+    """
+    Wait up to ``timeout`` seconds for page changes, with a single
+    ``execute_async_script`` call. Returns every event queued since the last
+    call (an empty list on timeout), or None when the page has no results
+    container or round id to observe.
+    """
+    # only raise the script timeout when it is too short, setting it is another round trip
+    if getattr(driver, '_bet_script_timeout', 0) < timeout + 1:
+        driver._bet_script_timeout = timeout + 5
+        driver.set_script_timeout(driver._bet_script_timeout)
+
+    raw = driver.execute_async_script(OBSERVER_SCRIPT, int(timeout * 1000))
+    if raw is None:
+        return None
+    events = []
+    for e in raw:
+        results = _parse_results(e.get('results'))
+        value = (results[0] if results else None) if e['kind'] == 'result' else e.get('value')
+        events.append(PageEvent(kind=e['kind'], value=value, results=results, at=e.get('at', 0)))
+    return events
+
+
+def watch_page(driver: uc.Chrome) -> bool:
+    """Arm the observer and drop any queued events; returns False if nothing could be observed."""
+    try:
+        return next_page_events(driver, 0) is not None
+    except Exception as e:
+        logging.error(f'Could not install page observer: {e}')
+        return False
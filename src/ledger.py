@@ -0,0 +1,385 @@
+import csv
+import io
+import logging
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from src.config import get_config
+
+config = get_config()
+
+COLUMNS = ['timestamp', 'round_id', 'bet_amount', 'result', 'outcome', 'balance']
+CSV_PATH = 'data/betting_log.csv'
+
+DateLike = date | datetime | str | None
+
+
+@dataclass
+class TailCursor:
+    """Where the previous incremental read of a ledger stopped."""
+    offset: int = 0
+    mtime: float = 0.0
+    inode: int = 0
+
+
+def _to_timestamp_str(value: DateLike) -> str | None:
+    """Normalise a date bound to the 'YYYY-MM-DD HH:MM:SS' format used in the log."""
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _select_columns(columns: Iterable[str] | None) -> list[str]:
+    if columns is None:
+        return list(COLUMNS)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown betting log columns: {unknown}")
+    return list(columns)
+
+
+def _empty_frame(columns: list[str]) -> pd.DataFrame:
+    df = pd.DataFrame(columns=columns)
+    if 'timestamp' in columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+
+def _filter_range(df: pd.DataFrame, start: DateLike, end: DateLike) -> pd.DataFrame:
+    if start is not None:
+        df = df[df['timestamp'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['timestamp'] < pd.Timestamp(end)]
+    return df
+
+
+class CsvLedger:
+    """Bet log stored as a single append-only CSV file."""
+
+    def __init__(self, path: str = CSV_PATH):
+        self.path = path
+
+    def setup(self) -> None:
+        """Create the log with its header if it doesn't exist."""
+        if not os.path.exists(self.path):
+            with open(self.path, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(COLUMNS)
+
+    def append(self, row: list) -> None:
+        with open(self.path, 'a', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(row)
+
+    def read(self, start: DateLike = None, end: DateLike = None,
+             columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """
+        Read bets with ``start <= timestamp < end`` as a DataFrame.
+
+        The CSV has no index, so the whole file is scanned and then filtered.
+        """
+        columns = _select_columns(columns)
+        usecols = columns if 'timestamp' in columns or (start is None and end is None) \
+            else ['timestamp'] + columns
+        try:
+            df = pd.read_csv(self.path, usecols=usecols,
+                             parse_dates=['timestamp'] if 'timestamp' in usecols else False)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return _empty_frame(columns)
+
+        return _filter_range(df, start, end)[columns].reset_index(drop=True)
+
+    def read_chunks(self, start: DateLike = None, end: DateLike = None,
+                    columns: Iterable[str] | None = None,
+                    chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Like :meth:`read`, but yields the rows in blocks of at most ``chunksize``."""
+        columns = _select_columns(columns)
+        usecols = columns if 'timestamp' in columns or (start is None and end is None) \
+            else ['timestamp'] + columns
+        try:
+            reader = pd.read_csv(self.path, usecols=usecols, chunksize=chunksize,
+                                 parse_dates=['timestamp'] if 'timestamp' in usecols else False)
+            for chunk in reader:
+                chunk = _filter_range(chunk, start, end)
+                if not chunk.empty:
+                    yield chunk[columns]
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return
+
+    def read_since(self, cursor: TailCursor | None) -> tuple[pd.DataFrame | None, TailCursor]:
+        """
+        Parse only the rows appended after ``cursor`` (everything when it is None).
+
+        A trailing line that is still being written is left for the next call.
+        Returns ``None`` instead of a frame when the file was replaced or
+        truncated since the cursor, in which case the caller must reload.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return _empty_frame(list(COLUMNS)), TailCursor()
+
+        if cursor is not None:
+            if stat.st_ino != cursor.inode or stat.st_size < cursor.offset:
+                return None, TailCursor()
+            if stat.st_size == cursor.offset and stat.st_mtime == cursor.mtime:
+                return _empty_frame(list(COLUMNS)), cursor
+
+        offset = cursor.offset if cursor is not None else 0
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b'\n') + 1]
+        new_cursor = TailCursor(offset + len(data), stat.st_mtime, stat.st_ino)
+
+        if not data.strip() or (offset == 0 and data.count(b'\n') <= 1):
+            return _empty_frame(list(COLUMNS)), new_cursor
+        df = pd.read_csv(io.BytesIO(data), parse_dates=['timestamp'],
+                         header=0 if offset == 0 else None,
+                         names=None if offset == 0 else COLUMNS)
+        return df, new_cursor
+
+    def delete_before(self, cutoff: DateLike) -> None:
+        """Drop rows older than ``cutoff`` by atomically rewriting the file."""
+        cutoff = _to_timestamp_str(cutoff)
+        if not os.path.exists(self.path):
+            return
+
+        tmp_path = self.path + '.tmp'
+        with open(self.path, 'r', newline='') as src, open(tmp_path, 'w', newline='') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            writer.writerow(next(reader, COLUMNS))
+            for row in reader:
+                if row and row[0] >= cutoff:
+                    writer.writerow(row)
+        os.replace(tmp_path, self.path)
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yield every bet as a dict of raw values, oldest first."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', newline='') as csvfile:
+            yield from csv.DictReader(csvfile)
+
+    def first_timestamp(self) -> pd.Timestamp | None:
+        """Timestamp of the oldest bet, read from the first row only."""
+        row = next(self.iter_rows(), None)
+        return pd.Timestamp(row['timestamp']) if row and row.get('timestamp') else None
+
+    def export_csv(self) -> bytes:
+        if not os.path.exists(self.path):
+            return b''
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class SqliteLedger:
+    """
+    Bet log stored in SQLite in WAL mode.
+
+    WAL lets the Dashboard and the analytics read while the bot keeps
+    writing, and the indexes on timestamp, round_id and outcome let reports
+    fetch only the rows they need.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def setup(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    round_id INTEGER,
+                    bet_amount INTEGER,
+                    result TEXT,
+                    outcome TEXT,
+                    balance NUMERIC
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_timestamp ON bets(timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_round_id ON bets(round_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_outcome ON bets(outcome)")
+
+    def append(self, row: list) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: Iterable[list]) -> int:
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.executemany(
+                f"INSERT INTO bets ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                (list(row) for row in rows)
+            )
+            return cursor.rowcount
+
+    def _where(self, start: DateLike, end: DateLike) -> tuple[str, list]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_to_timestamp_str(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(_to_timestamp_str(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def read(self, start: DateLike = None, end: DateLike = None,
+             columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """Read bets with ``start <= timestamp < end`` using the timestamp index."""
+        columns = _select_columns(columns)
+        if not os.path.exists(self.path):
+            return _empty_frame(columns)
+
+        where, params = self._where(start, end)
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM bets{where} ORDER BY id",
+                conn,
+                params=params,
+                parse_dates=['timestamp'] if 'timestamp' in columns else None
+            )
+
+    def read_chunks(self, start: DateLike = None, end: DateLike = None,
+                    columns: Iterable[str] | None = None,
+                    chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        columns = _select_columns(columns)
+        if not os.path.exists(self.path):
+            return
+
+        where, params = self._where(start, end)
+        with closing(self._connect()) as conn:
+            yield from pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM bets{where} ORDER BY id",
+                conn,
+                params=params,
+                parse_dates=['timestamp'] if 'timestamp' in columns else None,
+                chunksize=chunksize
+            )
+
+    def read_since(self, cursor: TailCursor | None) -> tuple[pd.DataFrame | None, TailCursor]:
+        """Read the rows inserted after ``cursor`` using the row id as offset."""
+        last_id = cursor.offset if cursor is not None else 0
+        if not os.path.exists(self.path):
+            return _empty_frame(list(COLUMNS)), TailCursor()
+
+        with closing(self._connect()) as conn:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM bets").fetchone()[0]
+            if max_id < last_id:
+                # The database was recreated since the cursor was taken
+                return None, TailCursor()
+            df = pd.read_sql_query(
+                f"SELECT id, {', '.join(COLUMNS)} FROM bets WHERE id > ? ORDER BY id",
+                conn,
+                params=[last_id],
+                parse_dates=['timestamp']
+            )
+        if not df.empty:
+            last_id = int(df['id'].iloc[-1])
+        return df.drop(columns='id'), TailCursor(offset=last_id)
+
+    def delete_before(self, cutoff: DateLike) -> None:
+        if not os.path.exists(self.path):
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM bets WHERE timestamp < ?", (_to_timestamp_str(cutoff),))
+
+    def count(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM bets").fetchone()[0]
+
+    def first_timestamp(self) -> pd.Timestamp | None:
+        """Timestamp of the oldest bet, from the timestamp index."""
+        if not os.path.exists(self.path):
+            return None
+        with closing(self._connect()) as conn:
+            first = conn.execute("SELECT MIN(timestamp) FROM bets").fetchone()[0]
+        return pd.Timestamp(first) if first else None
+
+    def iter_rows(self) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM bets ORDER BY id"):
+                yield dict(row)
+
+    def export_csv(self) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        for row in self.iter_rows():
+            writer.writerow([row[c] for c in COLUMNS])
+        return buffer.getvalue().encode()
+
+
+Ledger = CsvLedger | SqliteLedger
+
+
+@lru_cache
+def get_ledger() -> Ledger:
+    """Return the ledger backend selected in the STORAGE section of config.ini."""
+    if config.storage.backend == 'sqlite':
+        return SqliteLedger(config.storage.sqlite_path)
+    if config.storage.backend != 'csv':
+        logging.warning(f"Unknown storage backend '{config.storage.backend}', using csv")
+    return CsvLedger()
+
+
+def import_csv(csv_file_path: str, ledger: SqliteLedger, batch_size: int = 10_000) -> int:
+    """
+    One-shot import of an existing CSV betting log into a SQLite ledger.
+
+    Returns the number of imported rows.
+    """
+    ledger.setup()
+    if ledger.count():
+        logging.warning(f"{ledger.path} already has bets, skipping import of {csv_file_path}")
+        return 0
+
+    imported = 0
+    with open(csv_file_path, 'r', newline='') as csvfile:
+        batch = []
+        for row in csv.DictReader(csvfile):
+            batch.append([row.get(c) for c in COLUMNS])
+            if len(batch) >= batch_size:
+                imported += ledger.append_many(batch)
+                batch = []
+        if batch:
+            imported += ledger.append_many(batch)
+    return imported
+
+
+if __name__ == "__main__":
+    # python -m src.ledger import [csv_path]   -> copy CSV history into SQLite
+    # python -m src.ledger export [csv_path]   -> dump the ledger back to CSV
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    target = sys.argv[2] if len(sys.argv) > 2 else CSV_PATH
+
+    if command == 'import':
+        count = import_csv(target, SqliteLedger(config.storage.sqlite_path))
+        print(f"Imported {count} rows into {config.storage.sqlite_path}")
+    elif command == 'export':
+        with open(target, 'wb') as f:
+            f.write(get_ledger().export_csv())
+        print(f"Exported ledger to {target}")
+    else:
+        print("Usage: python -m src.ledger [import|export] [csv_path]")
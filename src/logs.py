@@ -0,0 +1,112 @@
+"""
+Logging set up so the betting thread never waits on the disk or the console.
+
+Records are put on a queue by a ``QueueHandler`` and written by a
+``QueueListener`` thread, as text or, with ``[LOGGING] format = json``, as
+JSON lines carrying the round id and phase of the betting cycle. The log
+file is rotated by size or at midnight and old segments are gzipped.
+"""
+import atexit
+import copy
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime
+
+from src.config import get_config
+from src.tracing import current_context
+
+config = get_config()
+
+
+class CycleContextFilter(logging.Filter):
+    """Adds the round id and phase of the running cycle to records, on the thread that logs them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.round_id, record.phase = current_context()
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the args into the message but keep the traceback apart, for the JSON ``exc`` field."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+            'round_id': getattr(record, 'round_id', None),
+            'phase': getattr(record, 'phase', None),
+        }
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _file_handler(file_name: str) -> logging.Handler:
+    settings = config.logging
+    if settings.rotation == "size":
+        handler = logging.handlers.RotatingFileHandler(
+            file_name, maxBytes=settings.max_bytes, backupCount=settings.backups)
+    elif settings.rotation == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            file_name, when=settings.when, backupCount=settings.backups)
+    else:
+        return logging.FileHandler(file_name)
+    if settings.compress:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def setup_logging(log_format: str, file_name: str, level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a queue to a console handler using
+    ``log_format`` and a rotating file handler for ``file_name``.
+    """
+    file_handler = _file_handler(file_name)
+    file_handler.setFormatter(JsonFormatter() if config.logging.format == "json"
+                              else logging.Formatter(log_format))
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(log_format))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(CycleContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, console, file_handler, respect_handler_level=True)
+    listener.start()
+    # flush what is still queued when the bot exits
+    atexit.register(listener.stop)
+    return listener
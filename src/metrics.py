@@ -0,0 +1,191 @@
+"""
+Timings of each phase of a betting cycle and counters of rounds, skips,
+failed bets and restarts.
+
+Everything is kept in-process; :func:`start_exporter` serves it in the
+Prometheus text format on ``[METRICS] host:port`` and dumps it to
+``[METRICS] dump_path`` every ``dump_interval`` seconds.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+from src.config import get_config
+from src.tracing import span
+
+config = get_config()
+
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "betting_bot"
+
+# histogram name -> (label, help text)
+HISTOGRAMS = {
+    "phase_seconds": ("phase", "Time spent in each phase of a betting cycle."),
+    "driver_command_seconds": ("command", "Round trip of each WebDriver command."),
+    "cycle_driver_commands": ("command", "WebDriver commands sent per betting cycle."),
+}
+
+
+class Histogram:
+    """Count and sum of every observation, quantiles over the latest ``window`` of them."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self) -> dict[float, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        # histogram name -> label value -> histogram
+        self.histograms: dict[str, dict[str, Histogram]] = {name: {} for name in HISTOGRAMS}
+        # (name, sorted label items) -> value
+        self.counters: dict[tuple[str, tuple], int] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """Time the ``with`` block into the histogram of ``phase``, also when it raises, and trace it."""
+        start = time.perf_counter()
+        try:
+            with span(phase):
+                yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def observe(self, phase: str, seconds: float, histogram: str = "phase_seconds") -> None:
+        with self._lock:
+            self.histograms[histogram].setdefault(phase, Histogram()).observe(seconds)
+
+    def inc(self, name: str, amount: int = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (label, help_text) in HISTOGRAMS.items():
+                if not self.histograms[name]:
+                    continue
+                lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}_{name} summary")
+                for key, hist in sorted(self.histograms[name].items()):
+                    for q, value in hist.quantiles().items():
+                        lines.append(f"{PREFIX}_{name}{_labels({label: key, 'quantile': str(q)})} {value:.6f}")
+                    lines.append(f"{PREFIX}_{name}_sum{_labels({label: key})} {hist.sum:.6f}")
+                    lines.append(f"{PREFIX}_{name}_count{_labels({label: key})} {hist.count}")
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                    typed.add(name)
+                lines.append(f"{PREFIX}_{name}_total{_labels(dict(labels))} {value}")
+        lines.append(f"# TYPE {PREFIX}_uptime_seconds gauge")
+        lines.append(f"{PREFIX}_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            histograms = {
+                name: {
+                    key: {
+                        "count": hist.count,
+                        "sum": round(hist.sum, 6),
+                        **{f"p{int(q * 100)}": round(v, 6) for q, v in hist.quantiles().items()},
+                    }
+                    for key, hist in by_label.items()
+                }
+                for name, by_label in self.histograms.items()
+            }
+            counters = {}
+            for (name, labels), value in self.counters.items():
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                counters[f"{name}[{label}]" if label else name] = value
+        return {
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "uptime_seconds": round(time.time() - self.started),
+            **histograms,
+            "counters": counters,
+        }
+
+    def dump(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Could not write metrics: {e}")
+
+
+@lru_cache
+def get_metrics() -> Metrics:
+    return Metrics()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _dump_periodically(path: str, interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        get_metrics().dump(path)
+
+
+@lru_cache
+def start_exporter() -> None:
+    """Start the HTTP endpoint and the periodic JSON dump once per process, as configured."""
+    if not config.metrics.enabled:
+        return
+    if config.metrics.port:
+        try:
+            server = ThreadingHTTPServer((config.metrics.host, config.metrics.port), _Handler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logging.info(f"Metrics served on http://{config.metrics.host}:{config.metrics.port}/metrics")
+        except OSError as e:
+            logging.error(f"Could not start the metrics endpoint: {e}")
+    if config.metrics.dump_path and config.metrics.dump_interval > 0:
+        threading.Thread(target=_dump_periodically, args=(config.metrics.dump_path, config.metrics.dump_interval),
+                         name="metrics-dump", daemon=True).start()
@@ -0,0 +1,170 @@
+"""
+On-demand sampling profiler for the running bot.
+
+``kill -USR1 <pid>`` or touching ``[PROFILER] control_file`` starts a
+profile of ``[PROFILER] duration`` seconds (the control file may hold a
+different number of seconds). A side thread samples the stacks of the bot's
+threads and writes, to ``[PROFILER] output_dir``:
+
+- ``profile-<time>.pstats``, readable with ``python -m pstats`` or snakeviz
+- ``profile-<time>.collapsed``, one ``frame;frame;... count`` line per stack
+  for flamegraph.pl or speedscope
+
+While idle the only cost is one ``os.path.exists`` per ``poll_interval``.
+"""
+import logging
+import marshal
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from types import FrameType
+
+from src.config import get_config
+
+config = get_config()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# pstats key of a function: (filename, first line, name)
+FuncKey = tuple[str, int, str]
+
+
+def _stack(frame: FrameType | None) -> tuple[FuncKey, ...]:
+    """Functions on the stack of ``frame``, outermost first."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _label(key: FuncKey) -> str:
+    filename, line, name = key
+    if filename.startswith(ROOT):
+        filename = filename[len(ROOT):]
+    return f"{name} ({os.path.basename(filename) if 'site-packages' in filename else filename}:{line})"
+
+
+class SamplingProfiler:
+    """Samples every other thread's stack each ``interval`` seconds for ``duration`` seconds."""
+
+    def __init__(self, duration: float, interval: float):
+        self.duration = duration
+        self.interval = interval
+        # (thread name, stack) -> samples
+        self.samples: Counter[tuple[str, tuple[FuncKey, ...]]] = Counter()
+        # seconds each sample stands for, measured since sleeps overshoot the interval
+        self.sample_seconds = interval
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + self.duration
+        ticks = 0
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.samples[(names.get(ident, str(ident)), _stack(frame))] += 1
+            ticks += 1
+            time.sleep(self.interval)
+        self.sample_seconds = (time.monotonic() - started) / max(ticks, 1)
+
+    def collapsed(self) -> list[str]:
+        return [
+            ";".join([thread, *(_label(key) for key in stack)]) + f" {count}"
+            for (thread, stack), count in self.samples.most_common()
+        ]
+
+    def pstats(self) -> dict:
+        """
+        Samples in the ``pstats`` format: sampled self and cumulative time per
+        function, with the number of samples standing in for the call count.
+        """
+        tt: Counter[FuncKey] = Counter()
+        ct: Counter[FuncKey] = Counter()
+        calls: Counter[FuncKey] = Counter()
+        callers: defaultdict[FuncKey, Counter[FuncKey]] = defaultdict(Counter)
+        for (_, stack), count in self.samples.items():
+            if not stack:
+                continue
+            seconds = count * self.sample_seconds
+            tt[stack[-1]] += seconds
+            for key in set(stack):
+                ct[key] += seconds
+                calls[key] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers[callee][caller] += count
+        return {
+            key: (calls[key], calls[key], tt[key], ct[key],
+                  {caller: (n, n, 0.0, n * self.sample_seconds) for caller, n in callers[key].items()})
+            for key in ct
+        }
+
+    def save(self, output_dir: str) -> str:
+        """Write the .pstats and .collapsed files and return their path without extension."""
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        with open(base + ".pstats", "wb") as f:
+            marshal.dump(self.pstats(), f)
+        with open(base + ".collapsed", "w") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        return base
+
+
+class ProfilerControl:
+    """Waits on a side thread for SIGUSR1 or the control file and runs one profile at a time."""
+
+    def __init__(self):
+        self.requested = threading.Event()
+        self.duration = config.profiler.duration
+        self._thread = threading.Thread(target=self._run, name="profiler-control", daemon=True)
+
+    def start(self) -> None:
+        # handlers can only be installed from the main thread, and Windows has no SIGUSR1
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.requested.set())
+        self._thread.start()
+        logging.info(f"Profiler ready: send SIGUSR1 to {os.getpid()} or touch {config.profiler.control_file}")
+
+    def _check_control_file(self) -> None:
+        path = config.profiler.control_file
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                content = f.read().strip()
+            os.remove(path)
+        except OSError as e:
+            logging.error(f"Could not read the profiler control file: {e}")
+            return
+        self.duration = float(content) if content.replace(".", "", 1).isdigit() else config.profiler.duration
+        self.requested.set()
+
+    def _run(self) -> None:
+        while True:
+            if not self.requested.wait(config.profiler.poll_interval):
+                self._check_control_file()
+                if not self.requested.is_set():
+                    continue
+            self.requested.clear()
+            duration, self.duration = self.duration, config.profiler.duration
+            logging.info(f"Profiling for {duration:g} seconds")
+            try:
+                profiler = SamplingProfiler(duration, config.profiler.interval_ms / 1000)
+                profiler.run()
+                base = profiler.save(config.profiler.output_dir)
+                logging.info(f"Profile written to {base}.pstats and {base}.collapsed")
+            except Exception as e:
+                logging.error(f"Profiling failed: {e}")
+
+
+def start_profiler_control() -> None:
+    """Let a running bot be profiled on demand, if ``[PROFILER] enabled``."""
+    if config.profiler.enabled:
+        ProfilerControl().start()
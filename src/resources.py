@@ -0,0 +1,185 @@
+"""
+Chrome's CPU and memory use, and the low-CPU mode for long unattended runs.
+
+The bot only reads a handful of DOM nodes, so with ``[BROWSER] low_cpu`` on
+the game's video, images, fonts and animations are cut through CDP.
+"""
+import csv
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import psutil
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src.config import get_config
+
+config = get_config()
+
+MEMORY_LOG_PATH = os.path.join("data", "browser_memory.csv")
+
+# Requests Chrome drops in low-CPU mode: images, fonts and video streams
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.m4s", "*.flv",
+]
+
+# Stops CSS animations and transitions (end events still fire) and keeps every
+# <video>, present or added later, paused and without a source
+LOW_CPU_SCRIPT = """
+(() => {
+    if (window.__lowCpu) return;
+    window.__lowCpu = true;
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { animation-duration: 0s !important; '
+        + 'animation-iteration-count: 1 !important; transition-duration: 0s !important; }';
+    const stopVideos = () => document.querySelectorAll('video').forEach((video) => {
+        if (video.dataset.lowCpu) return;
+        video.dataset.lowCpu = '1';
+        video.pause();
+        video.preload = 'none';
+        video.autoplay = false;
+        video.removeAttribute('src');
+        video.load();
+    });
+    const start = () => {
+        document.head.appendChild(style);
+        stopVideos();
+        new MutationObserver(stopVideos).observe(document.documentElement, {childList: true, subtree: true});
+    };
+    if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', start);
+    else start();
+})();
+"""
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    # summed over the browser's processes; 100 is one full core
+    cpu_percent: float
+    rss_mb: float
+    processes: int
+
+    def __str__(self) -> str:
+        return f"CPU {self.cpu_percent:.0f}%, RSS {self.rss_mb:.0f} MB over {self.processes} processes"
+
+
+def browser_processes(driver: WebDriver) -> list[psutil.Process]:
+    """Chrome's browser process and all of its children (renderers, GPU, utilities)."""
+    pid = getattr(driver, 'browser_pid', None) or driver.service.process.pid
+    try:
+        root = psutil.Process(pid)
+        return [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return []
+
+
+def measure(driver: WebDriver, interval: float = 5.0) -> ResourceUsage:
+    """CPU use over the next ``interval`` seconds and the current resident memory of the browser."""
+    processes = browser_processes(driver)
+    for process in processes:
+        try:
+            process.cpu_percent(None)
+        except psutil.Error:
+            pass
+    time.sleep(interval)
+
+    cpu = rss = 0.0
+    alive = 0
+    for process in processes:
+        try:
+            cpu += process.cpu_percent(None)
+            rss += process.memory_info().rss
+            alive += 1
+        except psutil.Error:
+            continue
+    return ResourceUsage(cpu_percent=cpu, rss_mb=rss / 1024 ** 2, processes=alive)
+
+
+def apply_low_cpu_mode(driver: WebDriver) -> None:
+    """Block heavy assets, stop video and animations on the current page and every page loaded after it."""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': LOW_CPU_SCRIPT})
+    # Web Animations API animations, which the stylesheet doesn't reach, run 10x faster so they end sooner
+    driver.execute_cdp_cmd('Animation.enable', {})
+    driver.execute_cdp_cmd('Animation.setPlaybackRate', {'playbackRate': 10})
+    driver.execute_script(LOW_CPU_SCRIPT)
+
+
+def enable_low_cpu_mode(driver: WebDriver) -> None:
+    """Apply :func:`apply_low_cpu_mode` and log the browser's CPU and memory before and after."""
+    try:
+        before = measure(driver)
+        apply_low_cpu_mode(driver)
+        after = measure(driver)
+        logging.info(f"Low-CPU mode on. Before: {before}. After: {after}")
+    except Exception as e:
+        logging.error(f"Could not enable low-CPU mode: {e}")
+
+
+class MemoryWatchdog:
+    """
+    Samples the browser's RSS on a background thread, appends it to
+    ``browser_memory.csv`` and sets :attr:`recycle_requested` once the total
+    crosses ``limit_mb``. Acting on it is left to the bot, which recycles the
+    browser at the next point where no bet is in flight.
+    """
+
+    def __init__(self, driver: WebDriver, limit_mb: int | None = None,
+                 interval: float | None = None, path: str = MEMORY_LOG_PATH):
+        self.driver = driver
+        self.limit_mb = config.browser.memory_limit_mb if limit_mb is None else limit_mb
+        self.interval = interval or config.browser.memory_check_interval
+        self.path = path
+        self.recycle_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> tuple[float, float, int]:
+        """Total RSS of the browser, RSS of its largest renderer (both in MB) and the process count."""
+        total = renderer = 0.0
+        processes = browser_processes(self.driver)
+        for process in processes:
+            try:
+                rss = process.memory_info().rss / 1024 ** 2
+                total += rss
+                if '--type=renderer' in process.cmdline():
+                    renderer = max(renderer, rss)
+            except psutil.Error:
+                continue
+        return total, renderer, len(processes)
+
+    def _record(self, total: float, renderer: float, processes: int) -> None:
+        is_new = not os.path.exists(self.path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(['timestamp', 'browser_rss_mb', 'renderer_rss_mb', 'processes'])
+            writer.writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                             round(total, 1), round(renderer, 1), processes])
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                total, renderer, processes = self.sample()
+                self._record(total, renderer, processes)
+            except Exception as e:
+                logging.error(f"Memory watchdog sample failed: {e}")
+                continue
+            if self.limit_mb and total > self.limit_mb and not self.recycle_requested.is_set():
+                logging.warning(f"Browser uses {total:.0f} MB (limit {self.limit_mb} MB), "
+                                f"recycling it at the next safe point")
+                self.recycle_requested.set()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
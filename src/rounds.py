@@ -0,0 +1,149 @@
+"""
+Round phases of the game and how much of each betting window the bot used.
+
+A round goes WAITING -> OPEN -> CLOSED -> RESULT. :class:`RoundTracker` is fed
+page snapshots and observer/feed events, and the bot waits on it to place the
+bet as soon as the window opens instead of sleeping for a fixed time.
+"""
+import csv
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+from enum import Enum
+from typing import Callable, Optional
+
+from src.info import PageSnapshot
+from src.tracing import span
+
+TIMINGS_PATH = os.path.join("data", "round_timings.csv")
+
+
+class Phase(Enum):
+    WAITING = "waiting"
+    OPEN = "open"
+    CLOSED = "closed"
+    RESULT = "result"
+
+
+@dataclass
+class RoundTiming:
+    """Epoch seconds at which a round entered each phase and the bet was placed."""
+    round_id: Optional[int] = None
+    waiting_at: Optional[float] = None
+    open_at: Optional[float] = None
+    bet_at: Optional[float] = None
+    closed_at: Optional[float] = None
+    result_at: Optional[float] = None
+
+    def window_used(self) -> Optional[float]:
+        """Share of the betting window that had passed when the bet went in."""
+        if self.open_at is None or self.bet_at is None or self.closed_at is None:
+            return None
+        window = self.closed_at - self.open_at
+        return (self.bet_at - self.open_at) / window if window > 0 else None
+
+
+def _round_id(value) -> Optional[int]:
+    try:
+        return int(str(value).replace("Round ID: ", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+class RoundTracker:
+    """
+    Phase of the current round, moved along by :meth:`observe` (snapshots) and
+    :meth:`apply` (observer or feed events). Every round that reaches RESULT
+    is appended to ``round_timings.csv``.
+    """
+
+    def __init__(self, path: str = TIMINGS_PATH):
+        self.path = path
+        self.phase = Phase.WAITING
+        self.timing = RoundTiming(waiting_at=time.time())
+        self.results: Optional[list[str]] = None
+
+    def _enter(self, phase: Phase, now: float) -> None:
+        self.phase = phase
+        setattr(self.timing, f"{phase.value}_at", now)
+
+    def _new_round(self, round_id: Optional[int], now: float) -> None:
+        self.timing = RoundTiming(round_id=round_id, waiting_at=now)
+        self.phase = Phase.WAITING
+
+    def apply(self, kind: str, value, now: float | None = None) -> Phase:
+        """Account for a 'result', 'window' or 'round' change."""
+        now = time.time() if now is None else now
+        if kind == 'round':
+            round_id = _round_id(value)
+            if round_id is None or round_id == self.timing.round_id:
+                return self.phase
+            if self.timing.round_id is None and self.phase != Phase.RESULT:
+                self.timing.round_id = round_id
+            else:
+                self._new_round(round_id, now)
+        elif kind == 'window':
+            if value and self.phase == Phase.RESULT:
+                # the next window opened before the round id changed
+                self._new_round(None, now)
+            if value and self.phase == Phase.WAITING:
+                self._enter(Phase.OPEN, now)
+            elif value is False and self.phase == Phase.OPEN:
+                self._enter(Phase.CLOSED, now)
+        elif kind == 'result':
+            # re-baseline the results list on the next snapshot instead of counting this result again
+            self.results = None
+            if self.phase != Phase.RESULT:
+                self._enter(Phase.RESULT, now)
+                self._record()
+        return self.phase
+
+    def observe(self, snap: PageSnapshot, now: float | None = None) -> Phase:
+        """Move the phase along from a page or feed snapshot."""
+        if snap.results:
+            if self.results is not None and snap.results != self.results:
+                self.apply('result', snap.last_result, now)
+            self.results = list(snap.results)
+        if snap.round_id is not None:
+            self.apply('round', snap.round_id, now)
+        if snap.dragon_suspended is not None:
+            self.apply('window', not snap.dragon_suspended, now)
+        return self.phase
+
+    def mark_bet(self, now: float | None = None) -> None:
+        self.timing.bet_at = time.time() if now is None else now
+
+    def wait_for(self, phase: Phase, read: Callable[[], PageSnapshot],
+                 wait: Callable[[float], None], timeout: float) -> Optional[PageSnapshot]:
+        """
+        Read snapshots until the round reaches ``phase`` and return the snapshot
+        that showed it, or None after ``timeout`` seconds. ``wait(seconds)``
+        blocks between reads until the page may have changed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            snap = read()
+            if self.observe(snap) == phase:
+                return snap
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            wait(remaining)
+
+    def _record(self) -> None:
+        timing = self.timing
+        used = timing.window_used()
+        if used is not None:
+            logging.info(f"Round {timing.round_id}: bet placed {used:.0%} into the betting window")
+        try:
+            with span('write', path=self.path):
+                is_new = not os.path.exists(self.path)
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', newline='') as f:
+                    writer = csv.writer(f)
+                    if is_new:
+                        writer.writerow([column.name for column in fields(RoundTiming)] + ['window_used'])
+                    writer.writerow(list(asdict(timing).values()) + [used])
+        except OSError as e:
+            logging.error(f"Could not record round timings: {e}")
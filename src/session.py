@@ -0,0 +1,258 @@
+"""
+One Chrome kept alive across bot sessions, breaks and sleep windows.
+
+The driver is only relaunched when a health check fails, and the login is
+only repeated when the saved cookies and local storage no longer give a
+logged-in game page.
+"""
+import errno
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Callable, Optional
+
+import undetected_chromedriver as uc
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src.config import get_config
+from src.feed import enable_performance_log
+from src.info import wait_for_snapshot
+
+config = get_config()
+
+
+class StartupTimer:
+    """Time spent in each phase of bringing the game up, logged as one line."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = self.last = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> None:
+        breakdown = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.phases)
+        logging.info(f"{self.kind} in {self.last - self.started:.1f}s: {breakdown}")
+
+
+def patched_driver_path() -> str:
+    """
+    Path of a patched chromedriver kept in ``[BROWSER] driver_cache_dir``,
+    so it is downloaded and patched once instead of on every launch.
+    """
+    name = "undetected_chromedriver.exe" if os.name == "nt" else "undetected_chromedriver"
+    path = os.path.abspath(os.path.join(config.browser.driver_cache_dir, name))
+    if os.path.exists(path):
+        return path
+
+    logging.info("Downloading and patching chromedriver")
+    patcher = uc.Patcher()
+    patcher.auto()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copy2(patcher.executable_path, path)
+    try:
+        os.remove(patcher.executable_path)
+    except OSError:
+        pass
+    return path
+
+
+def _chrome_options(profile_dir: str | None) -> uc.ChromeOptions:
+    options = uc.ChromeOptions()
+    options.add_argument("--log-level=3")
+    if config.browser.state_source == "websocket":
+        enable_performance_log(options)
+    if profile_dir:
+        options.add_argument(f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+    return options
+
+
+# launch errors that point at the cached driver itself: Chrome updated past its
+# version, or the binary can't be executed. A locked profile or a crashed Chrome
+# also report "session not created" but say nothing about the driver.
+DRIVER_ERRORS = ("this version of chromedriver only supports", "executable", "exec format")
+
+
+def _cached_driver_broken(e: Exception) -> bool:
+    """Whether a launch failure means the cached driver has to be patched again."""
+    # only the OSErrors of executing the binary, not socket or connection errors
+    if isinstance(e, (PermissionError, FileNotFoundError)):
+        return True
+    if isinstance(e, OSError) and e.errno == errno.ENOEXEC:
+        return True
+    return any(marker in str(e).lower() for marker in DRIVER_ERRORS)
+
+
+def launch_driver(timer: StartupTimer | None = None) -> WebDriver:
+    """
+    Start and configure a new Chrome. With ``[BROWSER] profile_dir`` set the
+    profile, and with it the HTTP cache of the game's assets, survives restarts.
+    """
+    timer = timer or StartupTimer("Browser launch")
+    profile_dir = os.path.abspath(config.browser.profile_dir) if config.browser.profile_dir else None
+
+    if not config.browser.driver_cache_dir:
+        # uc downloads and patches the driver inside uc.Chrome
+        driver = uc.Chrome(options=_chrome_options(profile_dir), user_data_dir=profile_dir)
+        timer.mark("driver patch + browser launch")
+        return driver
+
+    driver_path = patched_driver_path()
+    timer.mark("driver patch")
+    try:
+        driver = uc.Chrome(options=_chrome_options(profile_dir), user_data_dir=profile_dir,
+                           driver_executable_path=driver_path)
+    except Exception as e:
+        if not _cached_driver_broken(e):
+            raise
+        logging.warning(f"Cached chromedriver failed to start ({e}), patching a new one")
+        os.remove(driver_path)
+        driver_path = patched_driver_path()
+        timer.mark("driver repatch")
+        driver = uc.Chrome(options=_chrome_options(profile_dir), user_data_dir=profile_dir,
+                           driver_executable_path=driver_path)
+    timer.mark("browser launch")
+    return driver
+
+
+class BrowserSession:
+    """Owns the bot's driver for the lifetime of the process instead of one bot session."""
+
+    def __init__(self, launch: Callable[[StartupTimer], WebDriver] = launch_driver,
+                 state_path: str | None = None):
+        self.launch = launch
+        self.state_path = state_path or config.browser.session_path
+        self.driver: Optional[WebDriver] = None
+        self.parked = False
+        self.timer: Optional[StartupTimer] = None
+
+    def healthy(self) -> bool:
+        """Whether the current driver still answers commands."""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logging.warning(f"Browser health check failed: {e}")
+            return False
+
+    def acquire(self) -> tuple[WebDriver, bool]:
+        """Return the live driver, launching a new one if needed, and whether it was just launched."""
+        if config.browser.reuse and self.healthy():
+            self.timer = StartupTimer("Warm start")
+            return self.driver, False
+        self.close()
+        profile_dir = config.browser.profile_dir
+        warm_profile = bool(profile_dir) and os.path.isdir(profile_dir)
+        self.timer = StartupTimer("Cold start, warm profile" if warm_profile else "Cold start, first boot")
+        logging.info("Launching browser")
+        self.driver = self.launch(self.timer)
+        self.parked = False
+        return self.driver, True
+
+    def is_logged_in(self, timeout: float = 15) -> bool:
+        """The game page only shows a balance to a logged-in user."""
+        try:
+            wait_for_snapshot(self.driver, lambda s: s.balance is not None, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def open_game(self, login: Callable[[], None], fresh: bool) -> None:
+        """
+        Bring the driver to a logged-in game page. A ``fresh`` driver first
+        gets the saved session state; ``login`` runs only when the game page
+        doesn't come up logged in.
+        """
+        timer = self.timer or StartupTimer("Game start")
+        if not fresh or self.restore_state():
+            self.driver.get(config.betting.game_link)
+            timer.mark("first page load")
+            self.parked = False
+            if self.is_logged_in():
+                timer.mark("game ready")
+                timer.report()
+                logging.info("Reusing the logged in browser session")
+                return
+            timer.mark("session check")
+
+        login()
+        timer.mark("login")
+        self.parked = False
+        self.save_state()
+        self.is_logged_in()
+        timer.mark("game ready")
+        timer.report()
+
+    def park(self) -> None:
+        """Leave the game page for a lightweight one while the bot isn't betting."""
+        if self.parked or not config.browser.park_url or not self.healthy():
+            return
+        try:
+            self.save_state()
+            self.driver.get(config.browser.park_url)
+            self.parked = True
+            logging.info(f"Browser parked on {config.browser.park_url}")
+        except Exception as e:
+            logging.error(f"Could not park the browser: {e}")
+
+    def save_state(self) -> None:
+        """Persist the site's cookies and local storage so a relaunch can skip the login."""
+        try:
+            state = {
+                "cookies": self.driver.get_cookies(),
+                "local_storage": self.driver.execute_script(
+                    "return Object.assign({}, window.localStorage);"),
+            }
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            # holds session tokens, keep it private
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logging.error(f"Could not save the browser session: {e}")
+
+    def restore_state(self) -> bool:
+        """Load the saved cookies and local storage into the site; returns whether there was any."""
+        if not os.path.exists(self.state_path):
+            return False
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            # cookies can only be set on a page of their own domain
+            self.driver.get(config.betting.site_link)
+            for cookie in state.get("cookies", []):
+                if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                    cookie.pop("sameSite", None)
+                if "expiry" in cookie:
+                    cookie["expiry"] = int(cookie["expiry"])
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+            self.driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) window.localStorage.setItem(k, v);",
+                state.get("local_storage") or {})
+            return True
+        except Exception as e:
+            logging.error(f"Could not restore the browser session: {e}")
+            return False
+
+    def close(self) -> None:
+        if self.driver is None:
+            return
+        logging.info("Closing browser instance.")
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
@@ -0,0 +1,101 @@
+"""
+Import-time benchmark of the bot process.
+
+Runs ``python -X importtime -c "import main"`` in fresh interpreters and
+checks the cumulative import time of ``main`` against
+``[STARTUP] import_budget_ms``, and that the modules kept lazy (plotting,
+Telegram) are not imported at startup. The import must also be free
+of side effects, so that only the import is measured: no threads started and
+no logging handlers installed. Exits non-zero on failure:
+
+    python -m src.startup [budget_ms]
+"""
+import ast
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.config import get_config
+
+config = get_config()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# only loaded when first used: graphs at midnight, telethon on the first notification.
+# pyarrow can't be deferred, pandas imports it itself
+LAZY_MODULES = ("matplotlib", "seaborn", "telethon")
+
+# run after the import: prints what the import left running, which should be nothing
+SIDE_EFFECTS = ("import logging, threading; "
+                "print([t.name for t in threading.enumerate() if t is not threading.main_thread()]); "
+                "print([type(h).__name__ for h in logging.getLogger().handlers])")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass
+class ImportProfile:
+    total_ms: float
+    # top-level package -> self time in ms
+    packages: Counter
+    modules: set[str]
+    # threads and root logging handlers left behind by the import
+    side_effects: list[str] = field(default_factory=list)
+
+
+def parse_importtime(stderr: str, module: str = "main") -> ImportProfile:
+    """Total import time of ``module`` and self time per top-level package from ``-X importtime`` output."""
+    total_us = 0
+    packages: Counter = Counter()
+    modules = set()
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules.add(name)
+        packages[name.split(".")[0]] += self_us / 1000
+        if name == module and len(indent) <= 1:
+            total_us = cumulative_us
+    return ImportProfile(total_ms=total_us / 1000, packages=packages, modules=modules)
+
+
+def measure(module: str = "main") -> ImportProfile:
+    """Import ``module`` in a fresh interpreter and profile it."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}; {SIDE_EFFECTS}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    profile = parse_importtime(proc.stderr, module)
+    threads, handlers = (ast.literal_eval(line) for line in proc.stdout.splitlines()[-2:])
+    profile.side_effects = [f"thread {name}" for name in threads] + [f"logging handler {name}" for name in handlers]
+    return profile
+
+
+def check(budget_ms: float, runs: int = 3, top: int = 15) -> bool:
+    # the first run also pays for a cold disk cache, the best run is the one compared to the budget
+    profiles = [measure() for _ in range(runs)]
+    best = min(profiles, key=lambda p: p.total_ms)
+    print(f"import main: best {best.total_ms:.0f} ms, worst {max(p.total_ms for p in profiles):.0f} ms "
+          f"over {runs} runs (budget {budget_ms:.0f} ms)\n")
+    print("Slowest packages (self time):")
+    for package, ms in best.packages.most_common(top):
+        print(f"  {ms:8.1f} ms  {package}")
+
+    eager = sorted({m.split(".")[0] for m in best.modules} & set(LAZY_MODULES))
+    if eager:
+        print(f"\nImported at startup but meant to be lazy: {', '.join(eager)}")
+    if best.side_effects:
+        print(f"\nLeft behind by the import: {', '.join(best.side_effects)}")
+    within = best.total_ms <= budget_ms
+    if not within:
+        print(f"\nOver budget by {best.total_ms - budget_ms:.0f} ms")
+    return within and not eager and not best.side_effects
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else config.startup.import_budget_ms
+    sys.exit(0 if check(budget) else 1)
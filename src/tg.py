@@ -1,26 +1,159 @@
-from telethon.sync import TelegramClient
+"""
+Telegram notifications sent from a background thread.
+
+:func:`notify` only queues the message and returns; a single worker thread
+keeps one connected client, coalesces repeated alerts and waits out rate
+limits, so the betting loop never blocks on Telegram.
+"""
 import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from src.config import get_config
+from src.tracing import span
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
 
 config = get_config()
 
-client = TelegramClient(
-    api_id=config.telegram.api_id,
-    api_hash=config.telegram.api_hash,
-    session='bot'
-)
+SEND_RETRIES = 5
+
+
+class Notifier:
+    """
+    Bounded queue of pending messages keyed by alert: a message with a key
+    already pending replaces it and is sent once with a repeat count, and a
+    key isn't sent again within ``cooldown`` seconds of its last send.
+    """
+
+    def __init__(self, max_pending: int = 100, cooldown: float | None = None,
+                 min_interval: float = 1.0):
+        self.max_pending = max_pending
+        self.cooldown = config.notification.cooldown if cooldown is None else cooldown
+        self.min_interval = min_interval
+        self.dropped = 0
+        # key -> (latest message, times notified)
+        self._pending: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._last_sent: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._client: "TelegramClient | None" = None
+        self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._thread.start()
+
+    def notify(self, msg: str, key: str | None = None) -> None:
+        """Queue ``msg`` without blocking; ``key`` groups alerts whose text changes, like a balance."""
+        key = key or msg
+        with self._lock:
+            if key in self._pending:
+                _, count = self._pending.pop(key)
+                self._pending[key] = (msg, count + 1)
+            else:
+                if len(self._pending) >= self.max_pending:
+                    dropped_key, _ = self._pending.popitem(last=False)
+                    self.dropped += 1
+                    logging.warning(f"Notification queue full, dropped: {dropped_key}")
+                self._pending[key] = (msg, 1)
+            self._idle.clear()
+        self._wake.set()
+
+    def flush(self, timeout: float = 30) -> bool:
+        """Wait until every queued message is sent; returns False on timeout."""
+        return self._idle.wait(timeout)
+
+    def _next_ready(self) -> tuple[tuple[str, str, int] | None, float | None]:
+        """The oldest pending message out of its cooldown, or the seconds until one will be."""
+        now = time.monotonic()
+        wait = None
+        with self._lock:
+            for key, (msg, count) in self._pending.items():
+                ready_in = self._last_sent.get(key, -self.cooldown) + self.cooldown - now
+                if ready_in <= 0:
+                    del self._pending[key]
+                    return (key, msg, count), None
+                wait = ready_in if wait is None else min(wait, ready_in)
+            if not self._pending:
+                self._idle.set()
+        return None, wait
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            item, wait = self._next_ready()
+            if item is None:
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+            key, msg, count = item
+            text = f"{msg} (x{count})" if count > 1 else msg
+            if loop.run_until_complete(self._send(text)):
+                self._last_sent[key] = time.monotonic()
+            time.sleep(self.min_interval)
+
+    async def _connect(self) -> "TelegramClient":
+        if self._client is None:
+            # telethon is only loaded once the first message is actually sent
+            from telethon import TelegramClient
+            self._client = TelegramClient(
+                api_id=config.telegram.api_id,
+                api_hash=config.telegram.api_hash,
+                session='bot'
+            )
+        if not self._client.is_connected():
+            await self._client.start(bot_token=config.telegram.bot_token)
+        return self._client
+
+    async def _send(self, text: str) -> bool:
+        if not config.telegram.bot_token:
+            logging.info(f"Telegram not configured, notification: {text}")
+            return True
+        from telethon.errors import FloodWaitError
+
+        for attempt in range(SEND_RETRIES):
+            try:
+                client = await self._connect()
+                await client.send_message(config.telegram.admin_username, text)
+                return True
+            except FloodWaitError as e:
+                logging.warning(f"Telegram flood wait, retrying in {e.seconds} seconds")
+                await asyncio.sleep(e.seconds + 1)
+            except Exception as e:
+                logging.error(f"Failed to send notification: {e}")
+                if self._client is not None:
+                    try:
+                        await self._client.disconnect()
+                    except Exception:
+                        pass
+                await asyncio.sleep(min(60, 2 ** attempt))
+        logging.error(f"Giving up on notification: {text}")
+        return False
+
+
+@lru_cache
+def get_notifier() -> Notifier:
+    return Notifier()
+
+
+def notify(msg: str, key: str | None = None) -> None:
+    """Send a Telegram message to the admin in the background."""
+    with span('notify', key=key or msg):
+        get_notifier().notify(msg, key)
 
-def send_sync(msg: str):
-    client.start(bot_token=config.telegram.bot_token)
-    client.send_message(config.telegram.admin_username, msg)
 
-async def send(msg: str):
-    await client.start(bot_token=config.telegram.bot_token)
-    await client.send_message(config.telegram.admin_username, msg)
+def send_sync(msg: str, timeout: float = 30) -> bool:
+    """Send a message and wait for it to go out."""
+    notifier = get_notifier()
+    notifier.notify(msg)
+    return notifier.flush(timeout)
 
-def notify(msg: str):
-    asyncio.run(send(msg))
 
 if __name__ == "__main__":
-    # notify("test")
-    send_sync("test")
\ No newline at end of file
+    send_sync("test")
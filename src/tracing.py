@@ -0,0 +1,185 @@
+"""
+One trace record per betting cycle, written to ``data/traces.jsonl``.
+
+A record holds the cycle's round id, how it ended and a tree of spans with
+start timestamps and durations: every timed phase, driver command, sleep,
+file write and notification made while the cycle ran. Records are handed to
+a background writer, so the betting thread never waits on the disk.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Iterator, Optional
+
+from src.config import get_config
+
+config = get_config()
+
+
+class Span:
+    __slots__ = ('name', 'start', 'duration', 'attrs', 'children')
+
+    def __init__(self, name: str, attrs: dict[str, Any]):
+        self.name = name
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.attrs = attrs
+        self.children: list[Span] = []
+
+    def to_dict(self) -> dict:
+        record = {'name': self.name, 'ts': round(self.start, 4),
+                  'ms': None if self.duration is None else round(self.duration * 1000, 2)}
+        if self.attrs:
+            record['attrs'] = self.attrs
+        if self.children:
+            record['spans'] = [child.to_dict() for child in self.children]
+        return record
+
+
+class Trace:
+    """Spans of one betting cycle; :meth:`annotate` adds fields to the record."""
+
+    def __init__(self):
+        self.root = Span('cycle', {})
+        self.stack = [self.root]
+        self.fields: dict[str, Any] = {}
+        self._started = time.perf_counter()
+
+    def annotate(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    def to_dict(self) -> dict:
+        self.root.duration = time.perf_counter() - self._started
+        return {**self.fields, **self.root.to_dict()}
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Record the ``with`` block as a span of the running cycle's trace, if there is one."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    item = Span(name, attrs)
+    trace.stack[-1].children.append(item)
+    trace.stack.append(item)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        item.duration = time.perf_counter() - start
+        trace.stack.pop()
+
+
+def traced_sleep(seconds: float) -> None:
+    """``time.sleep`` recorded as a span."""
+    with span('sleep', seconds=round(seconds, 3)):
+        time.sleep(seconds)
+
+
+def annotate(**fields: Any) -> None:
+    """Add fields such as the round id or a skip reason to the running cycle's trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace.annotate(**fields)
+
+
+def current_context() -> tuple[Any, Optional[str]]:
+    """Round id and phase of the running cycle, for log records."""
+    trace = _current.get()
+    if trace is None:
+        return None, None
+    return trace.fields.get('round_id'), trace.stack[1].name if len(trace.stack) > 1 else None
+
+
+@contextmanager
+def cycle() -> Iterator[Trace]:
+    """
+    Trace everything inside the ``with`` block as one record, written out
+    when tracing is on; the round id and phase are available to logging either way.
+    """
+    trace = Trace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        if config.tracing.enabled:
+            get_writer().write(trace.to_dict())
+
+
+def trace_driver(driver) -> None:
+    """Record every WebDriver command sent through ``driver`` as a span."""
+    if getattr(driver, '_traced', False):
+        return
+    execute = driver.execute
+
+    def traced_execute(driver_command, params=None):
+        with span(f'driver.{driver_command}'):
+            return execute(driver_command, params)
+
+    driver.execute = traced_execute
+    driver._traced = True
+
+
+class TraceWriter:
+    """
+    Appends records to ``path`` from a background thread, rolling it over to
+    ``path.1`` ... ``path.<backups>`` past ``max_bytes``. Records are dropped
+    rather than blocking when ``max_pending`` are already waiting.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int, max_pending: int = 1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _rollover(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _run(self) -> None:
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._rollover()
+                with open(self.path, 'a') as f:
+                    f.writelines(json.dumps(record, default=str) + '\n' for record in records)
+            except OSError as e:
+                logging.error(f"Could not write traces: {e}")
+
+
+@lru_cache
+def get_writer() -> TraceWriter:
+    return TraceWriter(config.tracing.path, config.tracing.max_bytes, config.tracing.backups)
@@ -9,12 +9,19 @@ import logging
 import time
 import random
 import csv
+import threading
+import pickle
+import subprocess
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from selenium.webdriver.common.action_chains import ActionChains
-from src.analytics.daily_report import generate_daily_report
-from src.analytics.summary import calculate_bet_metrics
-from src.analytics.graphs import generate_capital_growth_curve, win_loss_pie_chart, bet_size_histogram, profit_per_hour_heatmap
+from src.analytics.summary import bet_metrics_from_df, BetMetricsTracker
+from src.info import PageSnapshot, snapshot
+from src.ledger import get_ledger
+from src.tracing import traced_sleep
+from src.archive import first_bet_date, read_bets
+from src.analytics.rollups import Rollups
 
 config = get_config()
 
@@ -36,7 +43,7 @@ def delay():
     interval = random.randint(
         config.behaviour.pause_min, config.behaviour.pause_max)
     logging.info(f"Sleeping for {interval} seconds")
-    time.sleep(interval)
+    traced_sleep(interval)
 
 
 def navigate(driver: WebDriver, url: str):
@@ -45,26 +52,35 @@ def navigate(driver: WebDriver, url: str):
         window.dispatchEvent(new Event('popstate'));
     """)
 
-def reconnect(driver: WebDriver):
+def reconnect(driver: WebDriver, snap: PageSnapshot | None = None) -> bool:
+    """Click the Reconnect button if it is shown; returns whether it was clicked."""
     try:
+        if not (snap or snapshot(driver)).reconnect_visible:
+            return False
         driver.find_element(By.XPATH, "//button[normalize-space(text())='Reconnect']").click()
         logging.info("Reconnected")
+        return True
     except Exception as e:
-        pass
+        return False
 
 
-def log_bet(bet_log: BetLog):
+def log_bet(bet_log: BetLog, summary: BetMetricsTracker | None = None, rollups: Rollups | None = None):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open('data/betting_log.csv', 'a', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            timestamp,
-            bet_log.round_id,
-            bet_log.bet_amount,
-            bet_log.result,
-            bet_log.outcome,
-            bet_log.balance
-        ])
+    get_ledger().append([
+        timestamp,
+        bet_log.round_id,
+        bet_log.bet_amount,
+        bet_log.result,
+        bet_log.outcome,
+        bet_log.balance
+    ])
+    if summary is not None:
+        summary.update(bet_log.bet_amount, bet_log.outcome, bet_log.balance)
+    if rollups is not None:
+        try:
+            rollups.add(timestamp, bet_log.bet_amount, bet_log.outcome, bet_log.balance)
+        except Exception as e:
+            logging.error(f"Failed to update rollups: {e}")
 
 def is_now_in_range(start_str: str, end_str: str) -> bool:
     now = datetime.now().time()
@@ -81,61 +97,202 @@ def is_now_in_range(start_str: str, end_str: str) -> bool:
 def is_eod() -> bool:
     return is_now_in_range('00:00', '00:03')
 
+DAILY_REPORT_HEADER = ['report_date', 'rounds_played', 'wins', 'losses', 'profit', 'max_bet_placed', 'max_losing_streak', 'start_balance', 'final_balance']
+DAILY_REPORT_COLUMNS = ['timestamp', 'bet_amount', 'outcome', 'balance']
+
+def _report_row(report: dict) -> list:
+    return [
+        report["report_date"],
+        report["total_rounds_played"],
+        report["total_wins"],
+        report["total_losses"],
+        report["total_profit"],
+        report["max_bet_placed"],
+        report["max_losing_streak"],
+        report["start_balance"],
+        report["final_balance"],
+    ]
+
 def save_daily_report():
+    from src.analytics.daily_report import daily_report_from_df
     # today = datetime.now().date().strftime("%Y-%m-%d")
-    yesterday = (datetime.now() - timedelta(days=1)).date().strftime("%Y-%m-%d")
+    today = datetime.now().date()
+    yesterday = (today - timedelta(days=1)).strftime("%Y-%m-%d")
     logging.info(f"Generating daily report for {yesterday}")
-    report = generate_daily_report("data/betting_log.csv", yesterday)
+    df = read_bets(start=yesterday, end=today, columns=DAILY_REPORT_COLUMNS)
+    report = daily_report_from_df(df, yesterday)
     logging.info(f"Report: {report}")
 
     if not os.path.exists('data/daily_report.csv'):
         with open('data/daily_report.csv', 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
-            writer.writerow(
-                ['report_date', 'rounds_played', 'wins', 'losses', 'profit', 'max_bet_placed', 'max_losing_streak', 'start_balance', 'final_balance'])
+            writer.writerow(DAILY_REPORT_HEADER)
             
     with open('data/daily_report.csv', 'a', newline='') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow([
-            yesterday,
-            report["total_rounds_played"],
-            report["total_wins"],
-            report["total_losses"],
-            report["total_profit"],
-            report["max_bet_placed"],
-            report["max_losing_streak"],
-            report["start_balance"],
-            report["final_balance"],
-        ])
+        writer.writerow(_report_row(report))
     logging.info("Successfully saved daily report")
 
+def read_daily_report_dates() -> set[str]:
+    if not os.path.exists("data/daily_report.csv"):
+        return set()
+    with open('data/daily_report.csv', 'r', newline='') as csvfile:
+        return {row[0] for row in csv.reader(csvfile) if row and row[0] != 'report_date'}
+
 def is_daily_report_generated() -> bool:
     yesterday = (datetime.now() - timedelta(days=1)).date().strftime("%Y-%m-%d")
-    if os.path.exists("data/daily_report.csv"):
+    return yesterday in read_daily_report_dates()
+
+def upsert_daily_reports(reports: list[dict]):
+    """Insert or replace daily report rows, keeping the file ordered by date."""
+    rows: dict[str, list] = {}
+    if os.path.exists('data/daily_report.csv'):
         with open('data/daily_report.csv', 'r', newline='') as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if row[0] == yesterday:
-                    return True
-    return False
-
-def save_summary():
-    metrics = calculate_bet_metrics("data/betting_log.csv")
+            for row in csv.reader(csvfile):
+                if row and row[0] != 'report_date':
+                    rows[row[0]] = row
+    for report in reports:
+        rows[report["report_date"]] = _report_row(report)
+
+    tmp_path = 'data/daily_report.csv.tmp'
+    with open(tmp_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(DAILY_REPORT_HEADER)
+        for report_date in sorted(rows):
+            writer.writerow(rows[report_date])
+    os.replace(tmp_path, 'data/daily_report.csv')
+
+def backfill_daily_reports() -> list[str]:
+    """
+    Generate every missing daily report up to yesterday in one grouped pass
+    over the betting log. Returns the dates that were added.
+    """
+    # only needed at startup and midnight, keep them out of the bot's import
+    from src.analytics.daily_report import daily_report_from_df, daily_reports_from_df
+    from src.analytics.streaming import iter_chunks, stream_daily_reports
+    today = datetime.now().date()
+    yesterday = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    existing = read_daily_report_dates()
+    first_bet = first_bet_date()
+    days = pd.date_range(first_bet, yesterday).strftime("%Y-%m-%d") if first_bet else []
+    missing = {day for day in [*days, yesterday] if day not in existing}
+    if not missing:
+        return []
+
+    # the log is read from the earliest missing day, or from its start when there are no reports yet
+    start = min(missing) if existing else None
+    if config.analytics.streaming:
+        all_reports = stream_daily_reports(iter_chunks(start=start, end=today, columns=DAILY_REPORT_COLUMNS))
+    else:
+        all_reports = daily_reports_from_df(read_bets(start=start, end=today, columns=DAILY_REPORT_COLUMNS))
+
+    reports = [r for r in all_reports if r["report_date"] in missing]
+    # Mark days without bets as done too, like save_daily_report does for yesterday
+    for day in sorted(missing - {r["report_date"] for r in reports}):
+        reports.append(daily_report_from_df(pd.DataFrame(columns=DAILY_REPORT_COLUMNS), day))
+
+    if reports:
+        upsert_daily_reports(reports)
+        logging.info(f"Backfilled {len(reports)} daily reports")
+    return sorted(r["report_date"] for r in reports)
+
+def save_summary(summary: BetMetricsTracker | None = None):
+    """
+    Write ``data/bets_summary.csv``.
+
+    With a tracker the summary comes from its incremental state and the file
+    is only rewritten when a value changed; without one the whole betting log
+    is re-read.
+    """
+    if summary is None and config.analytics.streaming:
+        from src.analytics.streaming import stream_bet_metrics
+        metrics = stream_bet_metrics()
+    elif summary is None:
+        metrics = bet_metrics_from_df(read_bets(columns=['bet_amount', 'outcome', 'balance']))
+    else:
+        metrics = summary.metrics()
+        if metrics == summary.saved_metrics:
+            return
+
     with open('data/bets_summary.csv', 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['metric', 'value'])
         for key, value in metrics.items():
             writer.writerow([key, value])
 
+    if summary is not None:
+        summary.saved_metrics = metrics
+
+def _graph_payloads() -> dict[str, tuple]:
+    """Load the chart data once and return the arguments of every chart in ``CHARTS``."""
+    rollups = Rollups()
+    if rollups.exists():
+        return {
+            "capital_growth": rollups.capital_curve(),
+            "win_loss": rollups.win_loss(),
+            "bet_sizes": rollups.bet_sizes(),
+            "profit_per_hour": (rollups.profit_per_hour(),),
+        }
+
+    if config.analytics.streaming:
+        from src.analytics.streaming import stream_graph_data
+        data = stream_graph_data()
+        return {
+            "capital_growth": data.capital_curve(),
+            "win_loss": (data.win_count, data.loss_count),
+            "bet_sizes": (list(data.bet_counts), list(data.bet_counts.values())),
+            "profit_per_hour": (data.profit_per_hour(),),
+        }
+
+    from src.analytics import core
+    df = read_bets(columns=['timestamp', 'bet_amount', 'outcome', 'balance'])
+    hours = df["timestamp"].dt.hour.rename("hour")
+    profit = df["balance"].diff().fillna(0)
+    return {
+        "capital_growth": (core.round_sequence(len(df)), df["balance"].to_numpy()),
+        "win_loss": (int((df["outcome"] == "W").sum()), int((df["outcome"] == "L").sum())),
+        "bet_sizes": (df["bet_amount"].to_numpy(),),
+        "profit_per_hour": (profit.groupby(hours).sum(),),
+    }
+
 def generate_graphs():
+    # matplotlib and seaborn are only needed here, keep them out of the bot's startup
+    from src.analytics.graphs import render_chart
     logging.info("Generating graphs")
-    df = pd.read_csv("data/betting_log.csv", parse_dates=["timestamp"])
-    generate_capital_growth_curve(df)
-    win_loss_pie_chart(df)
-    bet_size_histogram(df)
-    profit_per_hour_heatmap(df)
+    for name, args in _graph_payloads().items():
+        render_chart(name, *args)
     logging.info("Successfully generated graphs")
 
+_graph_job: threading.Thread | None = None
+
+def _render_graphs_in_pool():
+    started = time.time()
+    try:
+        # a separate process owns the pool, so its spawned workers don't re-import main.py
+        proc = subprocess.run([sys.executable, "-m", "src.analytics.render"],
+                              input=pickle.dumps(_graph_payloads()), capture_output=True)
+        if proc.returncode:
+            logging.error(f"Graph generation finished with failed charts:\n{proc.stderr.decode(errors='replace')}")
+        else:
+            logging.info(f"Successfully generated graphs in {time.time() - started:.1f}s")
+    except Exception:
+        logging.error("Background graph generation failed", exc_info=True)
+
+def generate_graphs_in_background() -> bool:
+    """
+    Render the graphs in a process pool without blocking the caller.
+    Returns False if a previous job is still running.
+    """
+    global _graph_job
+    if _graph_job is not None and _graph_job.is_alive():
+        logging.info("Graph generation already in progress")
+        return False
+
+    logging.info("Scheduling graph generation")
+    _graph_job = threading.Thread(target=_render_graphs_in_pool, name="graph-renderer", daemon=True)
+    _graph_job.start()
+    return True
+
 def retry(retries: int = 3, delay: float = 1.0):
     """
     Decorator to retry a function on exception.
@@ -161,5 +318,10 @@ def retry(retries: int = 3, delay: float = 1.0):
 
 
 if __name__ == "__main__":
-    save_daily_report()
+    import sys
+    # python -m src.utils backfill  -> rebuild every missing daily report
+    if sys.argv[1:] == ['backfill']:
+        print(f"Added reports: {backfill_daily_reports()}")
+    else:
+        save_daily_report()
     # save_summary()
\ No newline at end of file